@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Measures the time spent importing the modules needed to run each command, which is most of the startup time of the
+application. Every command is measured in a fresh interpreter, a few times, and the fastest run is kept.
+
+Usage: python3 scripts/utils/benchmark_imports.py [command...]
+"""
+import subprocess
+import sys
+
+from blasmodcli.controller import HANDLERS
+
+RUNS = 5
+
+# Libraries that should only be imported by the commands that need them
+HEAVY_MODULES = ("aiohttp", "tkinter")
+
+
+def measure(command: str) -> tuple[float, set[str]]:
+    """
+    Imports the application and the handler of a command in a new interpreter.
+    :return: The total import time in milliseconds, and the heavy modules that were imported.
+    """
+    module_name = HANDLERS[command].rsplit(".", 1)[0]
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import blasmodcli.application, {module_name}"],
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    total = 0
+    imported = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_time, _, name = line.removeprefix("import time:").split("|")
+        total += int(self_time)
+        if name.strip() in HEAVY_MODULES:
+            imported.add(name.strip())
+    return total / 1000, imported
+
+
+def main() -> int:
+    commands = sys.argv[1:] or list(HANDLERS)
+    for command in commands:
+        times = []
+        imported = set()
+        for _ in range(RUNS):
+            time, imported = measure(command)
+            times.append(time)
+        heavy = ", ".join(sorted(imported)) or "-"
+        print(f"{command:<12} {min(times):8.1f} ms    heavy imports: {heavy}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
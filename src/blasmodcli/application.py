@@ -1,19 +1,59 @@
 from argparse import ArgumentParser
+from datetime import datetime
 from logging import FileHandler, StreamHandler, Formatter, DEBUG, WARNING
+import os
 import sys
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect
 
-from blasmodcli.controller import *
-from blasmodcli.model import Base
-from blasmodcli.utils import APP_NAME, logger, Directories
+from blasmodcli.controller import HANDLERS
+from blasmodcli.model import Base, SCHEMA_VERSION
+from blasmodcli.utils import APP_NAME, logger, Directories, Message
 from blasmodcli.utils.cli import CommandContext, CommandLineInterface
 from blasmodcli.utils.message import MessageFormatter
+from blasmodcli.utils.profiler import PROFILE_ENVIRONMENT_VARIABLE, ProfileMode, profiler
+
+# The key of the setting storing the state of the game configuration files when they were last loaded
+GAMES_FINGERPRINT = "games_fingerprint"
+
+
+def add_profile_arguments(parser: ArgumentParser):
+    default = os.environ.get(PROFILE_ENVIRONMENT_VARIABLE)
+    parser.add_argument(
+        "--profile", "--timings",
+        action="store_const",
+        const=ProfileMode.SUMMARY,
+        default=default if default in ProfileMode.ALL else None,
+        help="Measure the time spent in each phase of the command, and print a summary at the end.",
+        dest="profile"
+    )
+    parser.add_argument(
+        "--trace",
+        action="store_const",
+        const=ProfileMode.TRACE,
+        help="Measure the time spent in each phase of the command, and write a Chrome trace to the state directory.",
+        dest="profile"
+    )
+
+
+def get_profile_mode() -> str | None:
+    """
+    Reads the profile option before the application starts, so that the startup itself can be measured.
+    The full argument parser can only be created once the games are loaded.
+    """
+    parser = ArgumentParser(add_help=False)
+    add_profile_arguments(parser)
+    namespace, _ = parser.parse_known_args()
+    return namespace.profile
 
 
 class Application:
 
     def __init__(self):
+        self.profile_mode = get_profile_mode()
+        if self.profile_mode is not None:
+            profiler.enable()
+
         self.directories = Directories(APP_NAME)
         self.init_logger()
         self.database_file = Directories.require(self.directories.data / "database.sqlite3", parent=True)
@@ -21,8 +61,14 @@ class Application:
         self.context = CommandContext(self.directories, self.engine)
 
         # Initializing the database and updating the games first
-        Base.metadata.create_all(self.engine)
-        self.context.config.games.load_all()
+        with profiler.span("Initializing the database", "startup"):
+            self.init_database()
+        with profiler.span("Loading the game configurations", "startup"):
+            self.load_games()
+
+        # Then finish the installation that was interrupted the last time, if any
+        with profiler.span("Recovering the interrupted installation", "startup"):
+            self.context.fs.recover()
 
         # Then create the argument parser and give it its arguments
         self.parser = ArgumentParser()
@@ -32,6 +78,38 @@ class Application:
         self.cli = CommandLineInterface(self.context)
         self.add_command_handlers()
 
+    def init_database(self):
+        """
+        Creates the tables of the database.
+        Every table only holds data that can be retrieved again from the configuration files and the sources, so if
+        the database was created by a version of the application with a different schema, it is simply recreated.
+        The version of the schema is only written once every table is created, so the tables are not checked again
+        when the version matches.
+        """
+        with self.engine.begin() as connection:
+            version = connection.exec_driver_sql("PRAGMA user_version").scalar()
+            if version == SCHEMA_VERSION:
+                return
+            if len(inspect(connection).get_table_names()) != 0:
+                logger.warning("The structure of the database changed, run the 'update' command to fetch the mods again.")
+                Base.metadata.drop_all(connection)
+            Base.metadata.create_all(connection)
+            connection.exec_driver_sql(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def load_games(self):
+        """
+        Loads the game configuration files, unless none of them changed since the last time they were loaded.
+        The games are stored in the database, which is recreated along with the stored fingerprint when its schema
+        changes, so the games are loaded again in this case as well.
+        """
+        games = self.context.config.games
+        fingerprint = f"{SCHEMA_VERSION}:{games.fingerprint()}"
+        if self.context.tables.settings.get(GAMES_FINGERPRINT) == fingerprint:
+            return
+        games.load_all()
+        self.context.tables.settings.set(GAMES_FINGERPRINT, fingerprint)
+        self.context.tables.commit()
+
     def init_logger(self):
         file_formatter = Formatter("[%(asctime)s][%(levelname)s][%(name)s]: %(message)s", datefmt="%Y-%m-%d %H:%M:%S")
         file_handler = FileHandler(Directories.require(self.directories.state) / "main.log")
@@ -49,6 +127,7 @@ class Application:
         logger.info("============================ [ NEW SESSION ] ============================")
 
     def add_parser_arguments(self):
+        add_profile_arguments(self.parser)
         self.parser.add_argument(
             "game",
             choices=self.context.tables.games.get_all_ids(),
@@ -62,28 +141,27 @@ class Application:
         )
 
     def add_command_handlers(self):
-        # Game commands
-        self.cli.add_handler(Backup)
-        self.cli.add_handler(CD)
-        self.cli.add_handler(Configure)
-        self.cli.add_handler(Launch)
-        self.cli.add_handler(List)
-        self.cli.add_handler(Search)
-        self.cli.add_handler(Update)
-
-        # Mod commands
-        self.cli.add_handler(Download)
-        self.cli.add_handler(Info)
-        self.cli.add_handler(Install)
-        self.cli.add_handler(Remove)
-        self.cli.add_handler(Uninstall)
-        self.cli.add_handler(Upgrade)
+        for command, path in HANDLERS.items():
+            self.cli.add_lazy_handler(command, path)
 
     def run(self) -> int:
         namespace = self.parser.parse_args()
-        exit_code = self.cli.parse_args(
-            self.context.tables.games.get_by_id(namespace.game),
-            namespace.args
-        )
-        self.context.tables.session.close()
+        try:
+            with profiler.span("Running the command", "command", args=namespace.args):
+                exit_code = self.cli.parse_args(
+                    self.context.tables.games.get_by_id(namespace.game),
+                    namespace.args
+                )
+            self.context.tables.session.close()
+        finally:
+            self.write_profile()
         return exit_code
+
+    def write_profile(self):
+        """ Prints the summary of the time spent in each phase of the run, or writes it as a trace. """
+        if self.profile_mode == ProfileMode.SUMMARY:
+            profiler.print_summary(sys.stderr)
+        elif self.profile_mode == ProfileMode.TRACE:
+            file = self.directories.state / f"profile-{datetime.now():%Y%m%d-%H%M%S}.json"
+            profiler.write_trace(file)
+            Message.info(f"Profile written to '{file}'.")
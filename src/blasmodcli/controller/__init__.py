@@ -1,2 +1,22 @@
-from .game import *
-from .mod import *
+# The command handlers, by command name, along with the module defining them
+# Handlers are only imported when their command is run, so that a command does not import the libraries of every other
+HANDLERS = {
+    # Game commands
+    "backup": "blasmodcli.controller.game.backup.Backup",
+    "cache": "blasmodcli.controller.game.cache.Cache",
+    "cd": "blasmodcli.controller.game.cd.CD",
+    "configure": "blasmodcli.controller.game.configure.Configure",
+    "launch": "blasmodcli.controller.game.launch.Launch",
+    "list": "blasmodcli.controller.game.list.List",
+    "profile": "blasmodcli.controller.game.profile.Profile",
+    "search": "blasmodcli.controller.game.search.Search",
+    "update": "blasmodcli.controller.game.update.Update",
+
+    # Mod commands
+    "download": "blasmodcli.controller.mod.download.Download",
+    "info": "blasmodcli.controller.mod.info.Info",
+    "install": "blasmodcli.controller.mod.install.Install",
+    "remove": "blasmodcli.controller.mod.remove.Remove",
+    "uninstall": "blasmodcli.controller.mod.uninstall.Uninstall",
+    "upgrade": "blasmodcli.controller.mod.upgrade.Upgrade",
+}
@@ -1,7 +1,23 @@
-from .backup import Backup
-from .cd import CD
-from .configure import Configure
-from .launch import Launch
-from .list import List
-from .search import Search
-from .update import Update
+from importlib import import_module
+
+# The handlers are imported on first access, so that importing one of them does not import all the others
+HANDLER_MODULES = {
+    "Backup": ".backup",
+    "Cache": ".cache",
+    "CD": ".cd",
+    "Configure": ".configure",
+    "Launch": ".launch",
+    "List": ".list",
+    "Profile": ".profile",
+    "Search": ".search",
+    "Update": ".update",
+}
+
+__all__ = list(HANDLER_MODULES)
+
+
+def __getattr__(name: str):
+    module = HANDLER_MODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+    return getattr(import_module(module, __name__), name)
@@ -0,0 +1,84 @@
+import re
+
+from blasmodcli.controller.game.group import GameCommandGroup
+from blasmodcli.exceptions import NothingToDoException
+from blasmodcli.repositories import CachedArchive
+from blasmodcli.utils import Message, logger
+from blasmodcli.utils.cli import Argument
+from blasmodcli.utils.eviction import SECONDS_PER_DAY, EvictionPolicy
+from blasmodcli.view import NumberedList, accept_or_cancel, format_size, step
+
+SIZE_REGEX = re.compile(r"^(?P<value>[0-9]+(\.[0-9]+)?)\s*(?P<unit>[KMGT]?)(i?B)?$", re.IGNORECASE)
+
+SIZE_MULTIPLIERS = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4}
+
+
+def parse_size(text: str) -> int | None:
+    """ Converts a size like '500M' or '2GiB' to a number of bytes, or returns None if it is not a valid size. """
+    match = SIZE_REGEX.match(text.strip())
+    if match is None:
+        return None
+    return int(float(match.group("value")) * SIZE_MULTIPLIERS[match.group("unit").upper()])
+
+
+class Cache(GameCommandGroup):
+    """ Evicts archives from the cache, to keep it within a size budget or a number of versions per mod. """
+
+    action: str = Argument(choices=["gc"], help="'gc' evicts the archives exceeding the limits, the least recently used first.")
+    max_size: str = Argument("-s", help="The size the cache can take, like '500M' or '2G', instead of the configured one.")
+    keep_versions: int = Argument("-k", help="The number of most recent versions to keep for each mod, instead of the configured one.")
+    max_age: int = Argument("-a", help="The number of days after which an unused archive is evicted, instead of the configured one.")
+    dry_run: bool = Argument("-n", default=False, help="Only show the archives that would be evicted.")
+    yes: bool = Argument("-y", default=False, help="Skip the confirmation message.")
+
+    policy: EvictionPolicy
+
+    def post_init(self) -> int:
+        self.policy = EvictionPolicy.from_config(self.config.general)
+        if self.max_size is not None:
+            max_size = parse_size(self.max_size)
+            if max_size is None:
+                logger.error(f"Invalid size '{self.max_size}', expected a number of bytes optionally followed by K, M, G or T.")
+                return 1
+            self.policy.max_size = max_size
+        if self.keep_versions is not None:
+            self.policy.keep_versions = self.keep_versions
+        if self.max_age is not None:
+            self.policy.max_age = self.max_age * SECONDS_PER_DAY
+        return 0
+
+    @step("Pruning the store...")
+    def prune_store(self):
+        freed = self.fs.store.prune()
+        Message.success(f"Freed {format_size(freed)} of files that are not installed anymore from the store!")
+
+    @step("Evicting archives...")
+    def evict_archives(self, evicted: list[CachedArchive]):
+        self.fs.cache.evict(evicted)
+        numbered_list = NumberedList(len(evicted))
+        for archive in evicted:
+            numbered_list.add_item(f"Evicted {archive.file.name} ({format_size(archive.size)})")
+        Message.success(f"Freed {format_size(sum(archive.size for archive in evicted))} from the cache!")
+
+    async def handle(self) -> int:
+        if self.config.general.get("store", "enabled", bool, False) and not self.dry_run:
+            self.prune_store()
+
+        if self.policy.is_unlimited:
+            raise NothingToDoException("The cache has no limit, set one in the general settings or with the options.")
+
+        evicted = self.policy.collect(self.fs, dry_run=True)
+        if len(evicted) == 0:
+            raise NothingToDoException("The cache is already within its limits.")
+
+        Message.info(f"{len(evicted)} archives to evict ({format_size(sum(archive.size for archive in evicted))}):")
+        for archive in evicted:
+            print(f"        {archive.file.name}")
+        if self.dry_run:
+            return 0
+
+        if not self.yes:
+            accept_or_cancel(f"Are you sure you want to evict {len(evicted)} archives from the cache?")
+
+        self.evict_archives(evicted)
+        return 0
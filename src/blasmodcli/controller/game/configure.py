@@ -3,13 +3,12 @@ from shutil import which
 from subprocess import run
 from zipfile import ZipFile
 
-from aiohttp import ClientSession
-
 from blasmodcli.controller.game.group import GameCommandGroup
 from blasmodcli.exceptions import NothingToDoException
 from blasmodcli.utils import Message, logger
 from blasmodcli.utils.cli import Argument
-from blasmodcli.utils.jobs import download
+from blasmodcli.utils.jobs import DOWNLOAD_CHUNK_SIZE, download
+from blasmodcli.utils.network import create_session
 from blasmodcli.view import step, accept_or_cancel, NumberedList
 
 
@@ -46,8 +45,9 @@ class Configure(GameCommandGroup):
 
     @step("Downloading the modding tools...")
     async def download_modding_tools(self):
-        async with ClientSession() as session:
-            await download(session, self.download_url, self.archive)
+        async with create_session() as session:
+            chunk_size = self.config.general.get("downloads", "chunk_size", int, DOWNLOAD_CHUNK_SIZE)
+            await download(session, self.download_url, self.archive, chunk_size)
         Message.success("Successfully downloaded the modding tools!")
 
     @step("Extracting the modding tools...")
@@ -0,0 +1,243 @@
+from pathlib import Path
+import re
+
+from sqlalchemy.exc import NoResultFound
+
+from blasmodcli.controller.game.group import GameCommandGroup
+from blasmodcli.controller.mod.group import MOD_FULL_NAME_REGEX
+from blasmodcli.exceptions import NothingToDoException
+from blasmodcli.model import File, Installation, ModVersion, Version
+from blasmodcli.repositories import Store
+from blasmodcli.repositories.filesystems.entry import FILENAME_PATTERN
+from blasmodcli.utils import Color, Message, logger
+from blasmodcli.utils.cli import Argument
+from blasmodcli.view import ModList, NumberedList, accept_or_cancel, step
+
+PROFILE_NAME_REGEX = re.compile(r"^[a-zA-Z0-9][a-zA-Z0-9_-]*$")
+
+# The directory of the stash holding the manifests of the installations that were stashed
+STASHED_INSTALLATIONS_DIRECTORY = "installations"
+
+
+def get_full_name(mod_version: ModVersion) -> str:
+    return f"{mod_version.mod.source_name}/{mod_version.mod.name}:{mod_version.version}"
+
+
+def print_mod_list(message: str, mod_versions: list[ModVersion]):
+    mod_list = ModList(message)
+    mod_list.add_mods(mod_versions)
+    mod_list.display()
+
+
+class Profile(GameCommandGroup):
+    """ Saves the installed mods as a named profile, and switches between profiles. """
+
+    action: str = Argument(choices=["list", "show", "save", "activate", "delete"], help="What to do with the profile.")
+    name: str = Argument(nargs="?", help="The name of the profile, required by every action except 'list'.")
+    yes: bool = Argument("-y", default=False, help="Skip the confirmation message.")
+
+    stash: Store
+
+    def post_init(self) -> int:
+        self.stash = self.fs.stash(self.game)
+        if self.action == "list":
+            return 0
+        if self.name is None or PROFILE_NAME_REGEX.match(self.name) is None:
+            logger.error("A profile name made of letters, digits, '-' and '_' is required.")
+            return 1
+        if self.action != "save" and not self.fs.profiles.has(self.game, self.name):
+            logger.error(f"There is no profile named '{self.name}' for '{self.game.title}'.")
+            return 1
+        return 0
+
+    def get_installed(self) -> list[ModVersion]:
+        return self.fs.installations.get_all_latest_versions(self.game)
+
+    def read_profile(self, name: str) -> list[ModVersion] | None:
+        """ Returns the mod versions of a profile, or None if some of them are not known anymore. """
+        mod_versions = []
+        for full_name in self.fs.profiles.read(self.game, name):
+            match = MOD_FULL_NAME_REGEX.match(full_name)
+            if match is None or match.group("source_name") is None or match.group("tag") is None:
+                logger.error(f"Invalid mod '{full_name}' in the profile '{name}'.")
+                return None
+            source = self.tables.sources.get_by_name(self.game, match.group("source_name"))
+            mod = None
+            if source is not None:
+                try:
+                    mod = self.tables.mods.get_by_name(source, match.group("mod_name"))
+                except NoResultFound:
+                    pass
+            if mod is None:
+                logger.error(f"The mod '{full_name}' of the profile '{name}' is not available anymore.")
+                return None
+            mod_versions.append(ModVersion(mod, Version.from_tag(match.group("tag"))))
+        return mod_versions
+
+    def get_stashed_manifest(self, mod_version: ModVersion) -> Path:
+        installation_file = self.fs.installations.file(mod_version)
+        return self.stash.directory / STASHED_INSTALLATIONS_DIRECTORY / installation_file.name
+
+    def get_stashed_files(self, mod_version: ModVersion) -> list[tuple[str, str]] | None:
+        """ Returns the path and hash of the files of a stashed installation, or None if it cannot be restored. """
+        manifest = self.get_stashed_manifest(mod_version)
+        if not manifest.is_file():
+            return None
+        files = [(file.relpath, file.hash_digest) for file in Installation(manifest, mod_version, load=True).files]
+        for _, digest in files:
+            if not self.stash.object(digest).is_file():
+                return None
+        return files
+
+    def prune_stash(self):
+        """ Deletes the stashed installations that are not part of any profile anymore, and their files. """
+        full_names = set()
+        for name in self.fs.profiles.get_names(self.game):
+            full_names.update(self.fs.profiles.read(self.game, name))
+        kept_digests = set()
+        directory = self.stash.directory / STASHED_INSTALLATIONS_DIRECTORY
+        for manifest in directory.iterdir() if directory.is_dir() else ():
+            match = FILENAME_PATTERN.match(manifest.name)
+            if match is None or f"{match["source_name"]}/{match["mod_name"]}:{match["version"]}" not in full_names:
+                manifest.unlink()
+                continue
+            with manifest.open("r") as fd:
+                kept_digests.update(line.split(" ", 1)[0] for line in fd if len(line.strip()) != 0)
+        self.stash.prune(kept_digests)
+
+    @step("Switching profile...")
+    async def switch(self, removed: list[ModVersion], added: list[ModVersion]) -> int:
+        """
+        Replaces the installed mods that are not part of the profile by the ones that are.
+        The files of the uninstalled mods are kept in a stash as hard links, from which they are restored the next time
+        they are installed by switching profiles. Only the mods that were never stashed are extracted from their
+        archive, and the files that are identical in both sets of mods are left untouched.
+        """
+        transaction = self.fs.begin(self.game)
+        destination = self.game.modding_directory
+        removed_installations = [self.fs.installations.get(mod_version) for mod_version in removed]
+        removed_files: dict[str, str] = {}
+        for installation in removed_installations:
+            for file in installation.files:
+                if file.exists():
+                    self.stash.keep(file.path, file.hash)
+                    removed_files[file.relpath] = file.hash
+            manifest = self.get_stashed_manifest(installation.mod_version)
+            manifest.parent.mkdir(parents=True, exist_ok=True)
+            installation.write(manifest)
+            transaction.remove_manifest(installation)
+
+        # Only imported when switching, as the jobs need aiohttp which the other actions do not
+        from blasmodcli.utils.jobs import Extractor
+
+        restored_installations = []
+        store = self.fs.store if self.config.general.get("store", "enabled", bool, False) else None
+        extractor = Extractor(store=store)
+        for mod_version in added:
+            installation = self.fs.installations.new(mod_version)
+            staging = transaction.stage_directory(f"{mod_version.mod.source_name}_{mod_version.mod.name}")
+            stashed_files = self.get_stashed_files(mod_version)
+            if stashed_files is None:
+                recorded = self.fs.cache.get_digest(mod_version)
+                archive_digest = recorded[0] if recorded is not None else None
+                extractor.add(installation, self.fs.cache.file(mod_version), staging, archive_digest=archive_digest)
+                continue
+            for relpath, digest in stashed_files:
+                if removed_files.get(relpath) != digest and not self.stash.is_linked(digest, destination / relpath):
+                    self.stash.link(digest, staging / relpath)
+            installation.files = [File(installation, relpath, digest) for relpath, digest in stashed_files]
+            restored_installations.append(installation)
+
+        await extractor.run()
+        added_installations = restored_installations + [job.installation for job in extractor.jobs]
+        failed = len(extractor.failed_jobs)
+        if failed:
+            transaction.rollback()
+            for job in extractor.failed_jobs:
+                Message.error(f"Could not extract {job.archive}: {job.error.__class__.__name__}: {job.error}")
+            return failed
+
+        added_files = {file.relpath for installation in added_installations for file in installation.files}
+        transaction.delete(set(removed_files) - added_files)
+        for installation in added_installations:
+            self.fs.installations.stage(transaction, installation)
+        transaction.commit()
+        for installation in removed_installations:
+            self.fs.installations.unregister(installation.mod_version)
+        for installation in added_installations:
+            self.fs.installations.record(installation)
+
+        numbered_list = NumberedList(len(removed) + len(added))
+        for installation in removed_installations:
+            numbered_list.add_item(f"Uninstalled {installation.mod.display_name} {installation.version}")
+        for installation in added_installations:
+            numbered_list.add_item(f"Installed {installation.mod.display_name} {installation.version}")
+        self.prune_stash()
+        return 0
+
+    async def activate(self) -> int:
+        target = self.read_profile(self.name)
+        if target is None:
+            return 1
+        installed = self.get_installed()
+        installed_names = {get_full_name(mod_version) for mod_version in installed}
+        target_names = {get_full_name(mod_version) for mod_version in target}
+        removed = [mod_version for mod_version in installed if get_full_name(mod_version) not in target_names]
+        added = [mod_version for mod_version in target if get_full_name(mod_version) not in installed_names]
+        if len(removed) == 0 and len(added) == 0:
+            raise NothingToDoException(f"The profile '{self.name}' is already active.")
+
+        if len(removed) != 0:
+            print_mod_list(f"{len(removed)} mods to uninstall:", removed)
+        if len(added) != 0:
+            print_mod_list(f"{len(added)} mods to install:", added)
+        if not self.yes:
+            accept_or_cancel(f"Are you sure you want to activate the profile '{self.name}'?")
+
+        missing = [
+            get_full_name(mod_version) for mod_version in added
+            if self.get_stashed_files(mod_version) is None and not self.fs.cache.is_valid(mod_version)
+        ]
+        if len(missing) != 0:
+            from blasmodcli.controller.mod.download import Download
+            exit_code = await self.call(Download, mod_names=missing, not_recursive=True, yes=True)
+            if exit_code:
+                return exit_code
+
+        failed = await self.switch(removed, added)
+        if failed:
+            logger.error(f"Could not activate the profile '{self.name}', the installed mods did not change.")
+            return failed
+        Message.success(f"The profile '{self.name}' is now active!")
+        return 0
+
+    def list_profiles(self):
+        names = self.fs.profiles.get_names(self.game)
+        if len(names) == 0:
+            raise NothingToDoException(f"There is no profile for '{self.game.title}' yet.")
+        installed = {get_full_name(mod_version) for mod_version in self.get_installed()}
+        for name in names:
+            full_names = self.fs.profiles.read(self.game, name)
+            active = f" {Color.CYAN.fmt("[active]")}" if set(full_names) == installed else ""
+            print(f"{Color.WHITE.fmt(name)} ({len(full_names)} mods){active}")
+
+    async def handle(self) -> int:
+        match self.action:
+            case "list":
+                self.list_profiles()
+            case "show":
+                mod_versions = self.read_profile(self.name)
+                if mod_versions is None:
+                    return 1
+                print_mod_list(f"The profile '{self.name}' has {len(mod_versions)} mods:", mod_versions)
+            case "save":
+                installed = self.get_installed()
+                self.fs.profiles.write(self.game, self.name, [get_full_name(mod_version) for mod_version in installed])
+                Message.success(f"Saved the {len(installed)} installed mods as the profile '{self.name}'!")
+            case "activate":
+                return await self.activate()
+            case "delete":
+                self.fs.profiles.delete(self.game, self.name)
+                self.prune_stash()
+                Message.success(f"Deleted the profile '{self.name}'.")
+        return 0
@@ -5,19 +5,16 @@ from blasmodcli.utils import logger
 from blasmodcli.utils.cli import Argument
 from blasmodcli.view import Formatter
 
-WILDCARD = "%"
-
 
 class Search(GameCommandGroup):
     """ Lists every mod whose name, author or description contains the given string of text. """
 
     source: Optional[str] = Argument("-s", default=None, help="The name of the source in which you want to search.")
-    terms: list[str] = Argument(nargs="*", help="The list of terms that must appear in the name or description of the mod.")
+    terms: list[str] = Argument(nargs="*", help="The list of terms (or beginnings of words) that must appear in the name, authors or description of the mod.")
 
     async def handle(self) -> int:
-        pattern = WILDCARD + WILDCARD.join(self.terms) + WILDCARD
-        logger.debug(f"Searching for mod names or descriptions matching: {pattern}")
+        logger.debug(f"Searching for mods matching: {self.terms}")
         formatter = Formatter(self.fs)
-        for mod in self.tables.mods.search(self.game, self.source, pattern):
+        for mod in self.tables.mods.search(self.game, self.source, self.terms):
             formatter.summary(mod)
         return 0
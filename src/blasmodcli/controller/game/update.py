@@ -1,24 +1,52 @@
 from asyncio import TaskGroup
 from pathlib import Path
+from typing import Optional
+
+from aiohttp import ClientError, ClientSession
 
 from blasmodcli.controller.game.group import GameCommandGroup
-from blasmodcli.model import Mod, Source
-from blasmodcli.utils import Color, Message
-from blasmodcli.utils.parsing import OfficialModListParser, ModListParser
+from blasmodcli.exceptions import ApplicationException
+from blasmodcli.model import Dependency, Mod, Source
+from blasmodcli.utils import Color, Message, logger
+from blasmodcli.utils.cli import Argument
+from blasmodcli.utils.network import RateLimiter, create_session
+from blasmodcli.utils.network.ratelimit import MAX_CONCURRENT_REQUESTS, MAX_RETRIES
+from blasmodcli.utils.parsing import OfficialModListParser, ModListParser, hash_entry
 from blasmodcli.view import format_mod_name, Counter, step, NumberedList
 
+# The errors that only concern a single mod of a source, and that should not abort the update of every other mod:
+# invalid entries or releases, and network failures
+MOD_ERRORS = (ApplicationException, ClientError, KeyError, TimeoutError, ValueError)
+
 
 # TODO: show upgrades available
 class Update(GameCommandGroup):
     """ Updates the mod database and fetches the latest mod version, allowing to detect upgradable mods. """
 
+    jobs: Optional[int] = Argument("-j", default=None, type=int, help="The maximum number of simultaneous requests made to the sources.")
+
     parsers: list[ModListParser]
     mods: list[Mod]
+    removed_mods: list[Mod]
+    dependencies: list[tuple[Mod, Mod]]
+    failures: list[str]
+    failed_sources: list[Source]
+    session: ClientSession
+    limiter: RateLimiter
 
     def post_init(self):
         super().post_init()
         self.mods = []
+        self.removed_mods = []
+        self.dependencies = []
         self.parsers = []
+        self.failures = []
+        self.failed_sources = []
+        max_concurrent_requests = self.jobs
+        if max_concurrent_requests is None:
+            max_concurrent_requests = self.config.general.get("network", "max_concurrent_requests", int, MAX_CONCURRENT_REQUESTS)
+        max_retries = self.config.general.get("network", "max_retries", int, MAX_RETRIES)
+        self.limiter = RateLimiter(max(1, max_concurrent_requests), max(0, max_retries))
 
     @step("Reading mod source files...")
     async def read_configs(self):
@@ -30,33 +58,125 @@ class Update(GameCommandGroup):
 
     @step("Fetching sources...")
     async def fetch_sources(self):
-        for source in self.config.sources.all:
-            await self.fetch_source(source)
+        async with create_session(limit_per_host=self.limiter.max_concurrent_requests) as self.session:
+            for source in self.config.sources.all:
+                await self.fetch_source(source)
 
     @step("Resolving dependencies...")
     def resolve_dependencies(self):
         for parser in self.parsers:
-            parser.resolve_dependencies()
+            self.dependencies.extend(parser.resolve_dependencies())
 
     @step("Committing to database...")
     def commit_to_database(self):
-        self.tables.sources.update_all(self.config.sources.all)
-        self.tables.mods.update_all(self.mods)
+        """
+        Writes every change in a single transaction.
+        The dependencies of the parsed mods are written last, as the new mods only get an identifier once written.
+        """
+        self.tables.sources.upsert_all(self.config.sources.all)
+        self.tables.mods.delete_all(self.removed_mods)
+        self.tables.mods.upsert_all(self.mods)
+        parsed_mods = [mod for parser in self.parsers for mod in parser.mods.values() if mod.name in parser.dependencies]
+        self.tables.dependencies.delete_all_of([mod.id for mod in parsed_mods])
+        self.tables.dependencies.upsert_all([
+            Dependency(mod_id=mod.id, dependency_id=dependency.id)
+            for mod, dependency in self.dependencies
+        ])
+        self.tables.commit()
 
     async def fetch_source(self, source: Source):
-        parser = OfficialModListParser(source)
-        await parser.fetch()
-        counter = Counter(parser.total, f"Parsing mod source '{parser.source.name}' for '{parser.source.game_id}'")
+        parser = OfficialModListParser(source, self.session, self.tables.validators, self.limiter)
+        existing_mods = self.tables.mods.get_all_by_source(source)
+        try:
+            changed = await parser.fetch(revalidate=len(existing_mods) != 0)
+        except MOD_ERRORS as e:
+            Message.error(f"Could not fetch mod source '{source.name}' for '{source.game_id}', keeping the previous mods: {e}")
+            self.failed_sources.append(source)
+            return
+
+        self.failures = []
+        if changed:
+            await self.parse_source(parser, existing_mods)
+        else:
+            await self.refresh_source(parser, existing_mods)
+        self.parsers.append(parser)
+        self.report_failures(parser)
+
+    async def parse_source(self, parser: ModListParser, existing_mods: list[Mod]):
+        """
+        Parses the entries of a source that are new or changed since the last update.
+        Mods whose entry is identical are kept as they are, only their latest release is checked.
+        """
+        unchanged_mods = {mod.content_hash: mod for mod in existing_mods}
+        message = f"Parsing mod source '{parser.source.name}' for '{parser.source.game_id}'"
+        counter = Counter(0, message, complete=False)
         counter.print()
         async with TaskGroup() as task_group:
-            for data in parser.data():
-                task_group.create_task(self.fetch_mod(counter, parser, data))
-        parser.extend(self.mods)
-        self.parsers.append(parser)
+            # The entries are parsed while the list is still being received
+            try:
+                async for data in parser.data():
+                    counter.add()
+                    content_hash = hash_entry(data)
+                    mod = unchanged_mods.get(content_hash)
+                    if mod is None:
+                        task_group.create_task(self.fetch_mod(counter, parser, data, content_hash))
+                    else:
+                        parser.keep(mod)
+                        task_group.create_task(self.refresh_mod(counter, parser, mod))
+            except MOD_ERRORS as e:
+                self.failures.append(f"The list of mods could not be read entirely: {e.__class__.__name__}: {e}")
+            counter.complete = True
+            counter.print()
+        self.merge_source(parser, existing_mods)
+
+    def merge_source(self, parser: ModListParser, existing_mods: list[Mod]):
+        """
+        Reconciles the mods parsed from a source with the ones already stored in the database.
+        New and changed mods are scheduled for writing, changed mods keep their identifier as they are written over the
+        previous row. The mods that disappeared from the source are scheduled for deletion, unless some entries could
+        not be parsed, as they would be deleted as well.
+        """
+        previous_mods = {mod.name: mod for mod in existing_mods}
+        for name, mod in parser.mods.items():
+            if previous_mods.pop(name, None) is not mod:
+                self.mods.append(mod)
+        if len(self.failures) == 0:
+            self.removed_mods.extend(previous_mods.values())
 
-    async def fetch_mod(self, counter: Counter, parser: ModListParser, data: dict):
-        mod = await parser.parse(data)
-        self.mods.append(mod)
+    def report_failures(self, parser: ModListParser):
+        if len(self.failures) == 0:
+            return
+        self.failed_sources.append(parser.source)
+        Message.warning(f"{len(self.failures)} mods of the source '{parser.source.name}' could not be updated:")
+        for failure in self.failures:
+            print(f"  {Color.RED.fmt("-")} {failure}")
+
+    async def refresh_source(self, parser: ModListParser, mods: list[Mod]):
+        """ Only looks for new releases of the mods of a source whose list did not change since the last update. """
+        message = f"Mod source '{parser.source.name}' for '{parser.source.game_id}' unchanged, checking releases"
+        counter = Counter(len(mods), message)
+        counter.print()
+        async with TaskGroup() as task_group:
+            for mod in mods:
+                task_group.create_task(self.refresh_mod(counter, parser, mod))
+
+    async def fetch_mod(self, counter: Counter, parser: ModListParser, data: dict, content_hash: str):
+        try:
+            await parser.parse(data, content_hash)
+        except MOD_ERRORS as e:
+            self.failures.append(f"{data.get("Name", "<unnamed mod>")}: {e.__class__.__name__}: {e}")
+        counter.increment()
+        counter.print()
+
+    async def refresh_mod(self, counter: Counter, parser: ModListParser, mod: Mod):
+        try:
+            latest_version = await parser.fetch_latest_version(mod.repository)
+        except MOD_ERRORS as e:
+            self.failures.append(f"{mod.display_name}: {e.__class__.__name__}: {e}")
+        else:
+            if latest_version != mod.latest_version:
+                mod.latest_version = latest_version
+                self.mods.append(mod)
         counter.increment()
         counter.print()
 
@@ -80,12 +200,14 @@ class Update(GameCommandGroup):
         else:
             Message.info("Nothing to show.")
 
-    # TODO: handle timeouts
     async def handle(self) -> int:
         await self.read_configs()
         await self.fetch_sources()
         self.resolve_dependencies()
         self.commit_to_database()
         self.check_for_upgrades()
+        if len(self.failed_sources) != 0:
+            logger.error(f"The update is incomplete, {len(self.failed_sources)} sources could not be entirely updated.")
+            return 1
         Message.success("Update successful!")
         return 0
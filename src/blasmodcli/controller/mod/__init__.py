@@ -1,6 +1,20 @@
-from .download import Download
-from .info import Info
-from .install import Install
-from .remove import Remove
-from .uninstall import Uninstall
-from .upgrade import Upgrade
+from importlib import import_module
+
+# The handlers are imported on first access, so that importing one of them does not import all the others
+HANDLER_MODULES = {
+    "Download": ".download",
+    "Info": ".info",
+    "Install": ".install",
+    "Remove": ".remove",
+    "Uninstall": ".uninstall",
+    "Upgrade": ".upgrade",
+}
+
+__all__ = list(HANDLER_MODULES)
+
+
+def __getattr__(name: str):
+    module = HANDLER_MODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+    return getattr(import_module(module, __name__), name)
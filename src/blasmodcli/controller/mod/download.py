@@ -3,7 +3,7 @@ from blasmodcli.exceptions import NothingToDoException
 from blasmodcli.model import ModVersion
 from blasmodcli.utils import Message
 from blasmodcli.utils.cli import Argument
-from blasmodcli.utils.jobs import Downloader
+from blasmodcli.utils.jobs import DOWNLOAD_CHUNK_SIZE, Downloader
 from blasmodcli.view import step, accept_or_cancel
 
 
@@ -15,16 +15,24 @@ class Download(ModCommandGroup):
     yes: bool = Argument("-y", default=False, help="Skip the confirmation message.")
 
     @step("Downloading mods...")
-    async def download_mods(self):
+    async def download_mods(self) -> int:
         number_of_mods = len(self.mod_versions)
-        downloader = Downloader(self.mod_versions, self.fs.cache)
+        chunk_size = self.config.general.get("downloads", "chunk_size", int, DOWNLOAD_CHUNK_SIZE)
+        downloader = Downloader(self.mod_versions, self.fs.cache, chunk_size=chunk_size)
         await downloader.run()
+        self.keep_cache_within_limits()
+        failed_jobs = downloader.failed_jobs
+        if len(failed_jobs) != 0:
+            for job in failed_jobs:
+                Message.error(f"Could not download {job.mod_version}: {job.error.__class__.__name__}: {job.error}")
+            return 1
         Message.success(f"Successfully downloaded {number_of_mods} mods!")
+        return 0
 
     def filter_cached(self):
         filtered = []
         for mod, version in self.mod_versions:
-            if not self.fs.cache.has(mod, version):
+            if not self.fs.cache.is_valid(ModVersion(mod, version)):
                 filtered.append(ModVersion(mod, version))
         self.mod_versions = filtered
 
@@ -45,5 +53,4 @@ class Download(ModCommandGroup):
             number_of_mods = len(self.mod_versions)
             accept_or_cancel(f"Are you sure you want to download {number_of_mods} mods?")
 
-        await self.download_mods()
-        return 0
+        return await self.download_mods()
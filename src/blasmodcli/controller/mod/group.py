@@ -4,13 +4,15 @@ from abc import ABC
 from sqlalchemy.exc import NoResultFound
 
 from blasmodcli.exceptions import UnknownModError, MultipleModsError
-from blasmodcli.exceptions.utils import UnresolvableDependency
+from blasmodcli.exceptions.utils import DependencyResolutionException
 from blasmodcli.model import Version
 from blasmodcli.model.mod import Mod
+from blasmodcli.repositories import Store
 from blasmodcli.utils import Message, logger
 from blasmodcli.utils.cli import CommandHandler, Argument
+from blasmodcli.utils.eviction import EvictionPolicy
 from blasmodcli.utils.resolver import DependencyResolver, ModVersion
-from blasmodcli.view import step, ModList
+from blasmodcli.view import step, ModList, format_size
 
 MOD_FULL_NAME_REGEX = re.compile(
     r"^((?P<source_name>[a-zA-Z]+[a-zA-Z0-9]*(-[a-zA-Z]+[a-zA-Z0-9]*)*)/)?"
@@ -34,19 +36,24 @@ class ModCommandGroup(CommandHandler, ABC):
         try:
             return self.tables.mods.get_by_name(source, mod_name)
         except NoResultFound:
-            raise UnknownModError(self.game, mod_name)
+            raise self.unknown_mod(mod_name)
 
     def get_mod_from_name_only(self, mod_name: str) -> Mod:
         mods = self.tables.mods.get_all_by_name(self.game, mod_name)
         number_of_mods = len(mods)
         if number_of_mods == 0:
-            raise UnknownModError(self.game, mod_name)
+            raise self.unknown_mod(mod_name)
         elif number_of_mods == 1:
             return mods[0]
         else:
             sources = [mod.source_name for mod in mods]
             raise MultipleModsError(self.game, mod_name, sources)
 
+    def unknown_mod(self, mod_name: str) -> UnknownModError:
+        """ Creates the error for a mod that does not exist, suggesting the mods with the closest names. """
+        suggestions = [f"{mod.source_name}/{mod.name}" for mod in self.tables.mods.get_similar(self.game, mod_name)]
+        return UnknownModError(self.game, mod_name, suggestions)
+
     def post_init(self) -> int:
         self.mod_versions = []
         for mod_name in self.mod_names:
@@ -72,17 +79,38 @@ class ModCommandGroup(CommandHandler, ABC):
 
     @step("Resolving dependencies...")
     def resolve_dependencies(self):
-        resolver = DependencyResolver([mv.mod for mv in self.mod_versions])
+        resolver = DependencyResolver(self.mod_versions, self.tables.dependencies.get_graph(self.game))
         try:
             resolver.resolve()
-        except UnresolvableDependency as e:
+        except DependencyResolutionException as e:
             logger.error(str(e))
             return 1
-        self.mod_versions.extend(resolver.get_latest_versions())
+        self.mod_versions = resolver.get_latest_versions()
         return 0
 
-    def print_mod_list(self, action: str):
-        number_of_mods = len(self.mod_versions)
-        mod_list = ModList(f"{number_of_mods} mods to {action}:")
-        mod_list.add_mods(self.mod_versions)
+    def get_store(self) -> Store | None:
+        """ Returns the store through which archives are installed, if it is enabled in the general settings. """
+        if self.config.general.get("store", "enabled", bool, False):
+            return self.fs.store
+        return None
+
+    def get_archive_digest(self, mod_version: ModVersion) -> str | None:
+        recorded = self.fs.cache.get_digest(mod_version)
+        return recorded[0] if recorded is not None else None
+
+    def keep_cache_within_limits(self):
+        """ Evicts the archives exceeding the limits of the cache set in the general settings, after downloading. """
+        policy = EvictionPolicy.from_config(self.config.general)
+        if policy.is_unlimited:
+            return
+        evicted = policy.collect(self.fs)
+        if len(evicted) != 0:
+            size = format_size(sum(archive.size for archive in evicted))
+            Message.info(f"Evicted {len(evicted)} archives ({size}) from the cache to keep it within its limits.")
+
+    def print_mod_list(self, action: str, mod_versions: list[ModVersion] | None = None):
+        if mod_versions is None:
+            mod_versions = self.mod_versions
+        mod_list = ModList(f"{len(mod_versions)} mods to {action}:")
+        mod_list.add_mods(mod_versions)
         mod_list.display()
@@ -1,11 +1,12 @@
-from zipfile import ZipFile, BadZipFile
+from asyncio import TaskGroup
+from zipfile import BadZipFile
 
-from blasmodcli.controller.mod.download import Download
 from blasmodcli.controller.mod.group import ModCommandGroup
 from blasmodcli.exceptions import NothingToDoException
-from blasmodcli.model import File, Installation, ModVersion
+from blasmodcli.model import ModVersion
 from blasmodcli.utils import Message, logger
 from blasmodcli.utils.cli import Argument
+from blasmodcli.utils.jobs import DOWNLOAD_CHUNK_SIZE, Downloader, DownloadJob, Extractor
 from blasmodcli.view import step, NumberedList, accept_or_cancel
 
 
@@ -17,8 +18,11 @@ class Install(ModCommandGroup):
     re_download: bool = Argument("-r", default=False, help="Download the mod again even if the version that needs to be installed is already in the cache.")
     yes: bool = Argument("-y", default=False, help="Skip the confirmation messages (download AND install).")
 
-    async def download_mods(self) -> int:
-        return await self.call(Download, mod_names=self.mod_names, force=self.re_download, yes=self.yes)
+    def get_downloads(self) -> list[ModVersion]:
+        """ Returns the mods to install whose archive needs to be downloaded first. """
+        if self.re_download:
+            return list(self.mod_versions)
+        return [mod_version for mod_version in self.mod_versions if not self.fs.cache.is_valid(mod_version)]
 
     def filter_installed(self):
         filtered: list[ModVersion] = []
@@ -28,60 +32,81 @@ class Install(ModCommandGroup):
         self.mod_versions = filtered
 
     @step("Installing mods...")
-    def install_mods(self) -> int:
+    async def install_mods(self, downloads: list[ModVersion]) -> int:
+        """
+        Extracts the mods to a staging directory, then moves their files to the modding directory all at once.
+        Each archive is verified and extracted as soon as it is downloaded, while the others are still downloading.
+        If any mod fails to be downloaded or extracted, none of them are installed.
+        """
         numbered_list = NumberedList(len(self.mod_versions))
-        failed = 0
-        for mod_version in self.mod_versions:
+        failures: dict[int, str] = {}
+        transaction = self.fs.begin(self.game)
+        extractor = Extractor(store=self.get_store())
+
+        def extract(mod_version: ModVersion):
+            if not self.fs.cache.is_valid(mod_version):
+                failures[mod_version.mod.id] = f"Missing or incomplete archive: {self.fs.cache.file(mod_version)}"
+                return
             installation = self.fs.installations.get(mod_version)
             if installation is None:
-                progress = numbered_list.add_progress(f"Installing {mod_version.mod.display_name}...")
-                try:
-                    self.new_installation(mod_version)
-                except BadZipFile:
-                    progress.failure(f"Bad ZIP file: {self.fs.cache.file(mod_version)}")
-                    failed += 1
-                else:
-                    progress.success()
+                installation = self.fs.installations.new(mod_version)
+            self.fs.cache.touch(mod_version)
+            staging = transaction.stage_directory(f"{mod_version.mod.source_name}_{mod_version.mod.name}")
+            archive_digest = self.get_archive_digest(mod_version)
+            extractor.add(installation, self.fs.cache.file(mod_version), staging, archive_digest=archive_digest)
+
+        def on_downloaded(job: DownloadJob):
+            extract(job.mod_version)
+
+        chunk_size = self.config.general.get("downloads", "chunk_size", int, DOWNLOAD_CHUNK_SIZE)
+        downloader = Downloader(downloads, self.fs.cache, chunk_size=chunk_size, on_downloaded=on_downloaded)
+        pending_downloads = {mod_version.mod.id for mod_version in downloads}
+        for mod_version in self.mod_versions:
+            if mod_version.mod.id not in pending_downloads:
+                extract(mod_version)
+
+        extractor.open()
+        async with TaskGroup() as task_group:
+            task_group.create_task(extractor.run())
+            try:
+                await downloader.run()
+            finally:
+                extractor.close()
+
+        for job in downloader.failed_jobs:
+            failures[job.mod_version.mod.id] = f"Could not download: {job.error.__class__.__name__}: {job.error}"
+        for job in extractor.failed_jobs:
+            if isinstance(job.error, BadZipFile):
+                failures[job.installation.mod.id] = f"Bad ZIP file: {job.archive}"
             else:
-                progress = numbered_list.add_progress(f"Reinstalling {mod_version.mod.display_name}...")
-                try:
-                    self.update_existing_installation(installation)
-                except BadZipFile:
-                    progress.failure(f"Bad ZIP file: {self.fs.cache.file(mod_version)}")
-                    failed += 1
-                else:
-                    progress.success()
-        return failed
+                failures[job.installation.mod.id] = f"{job.error.__class__.__name__}: {job.error}"
 
-    def new_installation(self, mod_version: ModVersion):
-        installation = self.fs.installations.new(mod_version)
-        with ZipFile(self.fs.cache.file(mod_version), "r") as zipfile:
-            for info in zipfile.infolist():
-                zipfile.extract(info, self.game.modding_directory)
-                file = File(installation, relpath=info.filename)
-                installation.files.append(file)
-        installation.persist()
-
-    def update_existing_installation(self, installation: Installation):
-        files = {file.relpath: file for file in installation.files}
-
-        with ZipFile(self.fs.cache.file(installation.mod_version), "r") as zipfile:
-            for info in zipfile.infolist():
-                zipfile.extract(info, self.game.modding_directory)
-                file = files.get(info.filename)
-                if file is None:
-                    file = File(installation, relpath=info.filename)
-                    installation.files.append(file)
-                else:
-                    file.update_hash()
-
-        installation.persist()
+        reinstalls = {job.installation.mod.id for job in extractor.jobs if job.installation.file.exists()}
+        failed = len(failures)
+        if failed:
+            transaction.rollback()
+        else:
+            for job in extractor.jobs:
+                transaction.delete(job.deleted_files)
+                self.fs.installations.stage(transaction, job.installation)
+            transaction.commit()
+            for job in extractor.jobs:
+                self.fs.installations.record(job.installation)
+        if len(downloads) != 0:
+            self.keep_cache_within_limits()
 
-    async def handle(self) -> int:
-        exit_code = await self.download_mods()
-        if exit_code:
-            return exit_code
+        for mod_version in self.mod_versions:
+            action = "Reinstalling" if mod_version.mod.id in reinstalls else "Installing"
+            progress = numbered_list.add_progress(f"{action} {mod_version.mod.display_name}...")
+            if mod_version.mod.id in failures:
+                progress.failure(failures[mod_version.mod.id])
+            elif failed:
+                progress.failure("Cancelled, because other mods could not be installed.")
+            else:
+                progress.success()
+        return failed
 
+    async def handle(self) -> int:
         if not self.not_recursive:
             exit_code = self.resolve_dependencies()
             if exit_code:
@@ -94,11 +119,17 @@ class Install(ModCommandGroup):
         if number_of_mods == 0:
             raise NothingToDoException("The mod and its dependencies are already installed.")
 
+        downloads = self.get_downloads()
+        if len(downloads) != 0:
+            self.print_mod_list("download", downloads)
+            if not self.yes:
+                accept_or_cancel(f"Are you sure you want to download {len(downloads)} mods?")
+
         self.print_mod_list("install")
         if not self.yes:
             accept_or_cancel(f"Are you sure you want to install {number_of_mods} mods?")
 
-        failed = self.install_mods()
+        failed = await self.install_mods(downloads)
         if failed:
             logger.error(f"Failed to install {failed} mods.")
             return failed
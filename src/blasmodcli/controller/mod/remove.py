@@ -1,6 +1,7 @@
 from blasmodcli.controller.mod.group import ModCommandGroup
 from blasmodcli.exceptions import NothingToDoException
-from blasmodcli.utils import Message
+from blasmodcli.model import ModVersion
+from blasmodcli.utils import Message, logger
 from blasmodcli.utils.cli import Argument
 from blasmodcli.view import NumberedList, step, accept_or_cancel
 
@@ -24,7 +25,10 @@ class Remove(ModCommandGroup):
         mods_deleted = 0
         for mod, version in self.mod_versions:
             p = numbered_list.add_progress(f"Removing version {version} of {mod.display_name} from the cache...")
-            self.fs.cache.remove_version(mod, version)
+            mod_version = ModVersion(mod, version)
+            if not self.fs.cache.is_valid(mod_version):
+                logger.info(f"The archive of {mod_version} was incomplete or corrupted.")
+            self.fs.cache.remove_version(mod_version)
             p.success()
             mods_deleted += 1
 
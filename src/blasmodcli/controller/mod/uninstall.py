@@ -14,32 +14,34 @@ class Uninstall(ModCommandGroup):
 
     def filter_uninstalled(self):
         filtered: list[ModVersion] = []
-        for mod, version in self.mod_versions:
-            if mod.installation is not None:
-                filtered.append(ModVersion(mod, version))
+        for mod, _ in self.mod_versions:
+            installed_version = self.fs.installations.get_latest_version(mod)
+            if installed_version is not None:
+                filtered.append(ModVersion(mod, installed_version))
         self.mod_versions = filtered
 
     def filter_required(self):
         filtered: list[ModVersion] = []
 
-        mods = [mod for mod, _ in self.mod_versions]
+        mod_ids = {mod.id for mod, _ in self.mod_versions}
+        graph = self.tables.dependencies.get_graph(self.game)
 
         for mod, version in self.mod_versions:
             ignore = False
-            for dep in mod.required_by:
-                if dep.mod not in mods and dep.mod.is_installed:
+            for dep in graph.get_required_by(mod):
+                if dep.mod_id not in mod_ids and self.fs.installations.has(dep.mod):
                     logger.debug(f"Dependency {mod.display_name} ignored because required by {dep.mod.display_name} which is installed")
                     ignore = True
             if not ignore:
                 filtered.append(ModVersion(mod, version))
         self.mod_versions = filtered
 
-    @step("Installing mods...")
+    @step("Uninstalling mods...")
     def uninstall_mods(self):
         numbered_list = NumberedList(len(self.mod_versions))
-        for mod, _ in self.mod_versions:
-            progress = numbered_list.add_progress(f"Uninstalling {mod.display_name}...")
-            mod.installation.delete()
+        for mod_version in self.mod_versions:
+            progress = numbered_list.add_progress(f"Uninstalling {mod_version.mod.display_name}...")
+            self.fs.installations.delete(self.fs.installations.get(mod_version))
             progress.success()
 
     async def handle(self) -> int:
@@ -54,7 +56,7 @@ class Uninstall(ModCommandGroup):
         number_of_mods = len(self.mod_versions)
 
         if number_of_mods == 0:
-            raise NothingToDoException("The mod and its dependencies are already installed.")
+            raise NothingToDoException("The mods are not installed, or are required by other installed mods.")
 
         self.print_mod_list("uninstall")
         if not self.yes:
@@ -1,11 +1,13 @@
-from zipfile import BadZipFile, ZipFile
+from zipfile import BadZipFile
 
+from blasmodcli.controller.mod.download import Download
 from blasmodcli.controller.mod.group import ModCommandGroup
 from blasmodcli.exceptions import NothingToDoException
-from blasmodcli.model import Installation, File
+from blasmodcli.model import Installation, ModVersion
 from blasmodcli.utils import Color, Message
 from blasmodcli.utils.cli import Argument
-from blasmodcli.view import format_mod_name, accept_or_cancel, NumberedList
+from blasmodcli.utils.jobs import Extractor, JobStatus
+from blasmodcli.view import format_mod_name, accept_or_cancel, step, NumberedList
 
 
 def print_upgrade_list(upgrades: list[Installation]):
@@ -31,41 +33,78 @@ class Upgrade(ModCommandGroup):
 
         if len(self.mod_versions) == 0:
             self.mod_versions = self.fs.installations.get_upgrades(self.game)
+        else:
+            self.mod_versions = [
+                ModVersion(mod, installed_version)
+                for mod, _ in self.mod_versions
+                if (installed_version := self.fs.installations.get_latest_version(mod)) is not None
+                and installed_version < mod.latest_version
+            ]
 
         self.upgrades = []
         for mod_version in self.mod_versions:
             self.upgrades.append(self.fs.installations.get(mod_version))
         return 0
 
-    def upgrade_mods(self, upgrades: list[Installation]):
+    async def download_upgrades(self) -> int:
+        mod_names = [f"{installation.mod.source_name}/{installation.mod.name}" for installation in self.upgrades]
+        return await self.call(Download, mod_names=mod_names, not_recursive=True, yes=True)
+
+    @step("Upgrading mods...")
+    async def upgrade_mods(self, upgrades: list[Installation]) -> int:
+        """
+        Extracts the latest version of each mod over its installed version, then moves their files to the modding
+        directory all at once. If any mod fails to be extracted, none of them are upgraded.
+        Only the files that differ between both versions are written, and the files that are not part of the latest
+        version anymore are deleted.
+        """
         numbered_list = NumberedList(len(upgrades))
         failed = 0
+        transaction = self.fs.begin(self.game)
+        extractor = Extractor(store=self.get_store())
         for installation in upgrades:
-            progress = numbered_list.add_progress(f"Upgrading {installation.mod.display_name}...")
-            try:
-                self.upgrade_mod(installation)
-            except BadZipFile:
-                progress.failure(f"Bad ZIP file: {self.fs.cache.file(installation.mod_version)}")
+            latest = ModVersion(installation.mod)
+            if not self.fs.cache.is_valid(latest):
+                progress = numbered_list.add_progress(f"Upgrading {installation.mod.display_name}...")
+                progress.failure(f"Missing or incomplete archive: {self.fs.cache.file(latest)}")
                 failed += 1
+                continue
+
+            previous_archive = self.fs.cache.file(installation.mod_version)
+            if not self.fs.cache.is_valid(installation.mod_version):
+                previous_archive = None
+            self.fs.cache.touch(latest)
+            new_installation = self.fs.installations.new(latest)
+            staging = transaction.stage_directory(f"{installation.mod.source_name}_{installation.mod.name}")
+            archive = self.fs.cache.file(latest)
+            archive_digest = self.get_archive_digest(latest)
+            extractor.add(new_installation, archive, staging, installation, previous_archive, archive_digest)
+
+        await extractor.run()
+        failed += len(extractor.failed_jobs)
+        if failed:
+            transaction.rollback()
+        else:
+            for job in extractor.jobs:
+                transaction.delete(job.deleted_files)
+                self.fs.installations.stage(transaction, job.installation, job.previous_installation)
+            transaction.commit()
+            for job in extractor.jobs:
+                self.fs.installations.record(job.installation, job.previous_installation)
+
+        for job in extractor.jobs:
+            progress = numbered_list.add_progress(f"Upgrading {job.installation.mod.display_name}...")
+            if job.status != JobStatus.COMPLETED:
+                if isinstance(job.error, BadZipFile):
+                    progress.failure(f"Bad ZIP file: {job.archive}")
+                else:
+                    progress.failure(f"{job.error.__class__.__name__}: {job.error}")
+            elif failed:
+                progress.failure("Cancelled, because other mods could not be upgraded.")
             else:
                 progress.success()
         return failed
 
-    def upgrade_mod(self, installation: Installation):
-        files = {file.relpath: file for file in installation.files}
-
-        with ZipFile(self.fs.cache.file(installation.mod_version), "r") as zipfile:
-            for info in zipfile.infolist():
-                zipfile.extract(info, self.game.modding_directory)
-                file = files.get(info.filename)
-                if file is None:
-                    file = File(installation, relpath=info.filename)
-                    installation.files.append(file)
-                else:
-                    file.update_hash()
-
-        installation.persist()
-
     async def handle(self) -> int:
         number_of_upgrades = len(self.upgrades)
         if number_of_upgrades == 0:
@@ -76,5 +115,13 @@ class Upgrade(ModCommandGroup):
         if not self.yes:
             accept_or_cancel(f"Are you sure you want to upgrade {number_of_upgrades} mods?")
 
-        self.upgrade_mods(self.upgrades)
+        exit_code = await self.download_upgrades()
+        if exit_code:
+            return exit_code
+
+        failed = await self.upgrade_mods(self.upgrades)
+        if failed:
+            Message.error(f"Failed to upgrade {failed} mods.")
+            return failed
+        Message.success(f"Successfully upgraded {number_of_upgrades} mods!")
         return 0
@@ -15,8 +15,15 @@ class ModNameError(ArgumentValueError):
 
 class UnknownModError(ModNameError):
 
+    def __init__(self, game: Game, mod_name: str, suggestions: list[str] = None):
+        super().__init__(game, mod_name)
+        self.suggestions = suggestions if suggestions is not None else []
+
     def __str__(self) -> str:
-        return f"Unknown mod '{self.mod_name}' for the game '{self.game.title}'."
+        message = f"Unknown mod '{self.mod_name}' for the game '{self.game.title}'."
+        if len(self.suggestions) != 0:
+            message += f"\nDid you mean: {", ".join(self.suggestions)}?"
+        return message
 
 
 class MultipleModsError(ModNameError):
@@ -1,3 +1,4 @@
 from .config import ConfigurationException, TOMLSectionException, TOMLFieldException, MissingSectionException, MissingFieldException, InvalidFieldTypeException
+from .network import NetworkException, RateLimitException
 from .parsing import ParsingException, NameConversionError
-from .resolver import DependencyResolutionException, UnresolvableDependency
+from .resolver import DependencyResolutionException, UnresolvableDependency, CircularDependency
@@ -0,0 +1,17 @@
+from blasmodcli.exceptions.base import ApplicationException
+
+
+class NetworkException(ApplicationException):
+    pass
+
+
+class RateLimitException(NetworkException):
+
+    def __init__(self, url: str, delay: float | None = None):
+        self.url = url
+        self.delay = delay
+
+    def __str__(self) -> str:
+        if self.delay is None:
+            return f"Too many requests made to '{self.url}'."
+        return f"Too many requests made to '{self.url}', the server asked to wait {self.delay:.0f} seconds."
@@ -16,3 +16,12 @@ class UnresolvableDependency(DependencyResolutionException):
     def __str__(self) -> str:
         return (f"{self.mod.display_name}'s minimum and maximum versions required are {self.minimum_version}"
                 f" and {self.maximum_version} respectively ({self.minimum_version} > {self.maximum_version}).")
+
+
+class CircularDependency(DependencyResolutionException):
+
+    def __init__(self, cycle: list[Mod]):
+        self.cycle = cycle
+
+    def __str__(self) -> str:
+        return f"Circular dependency between mods: {" -> ".join(mod.display_name for mod in self.cycle)}."
@@ -1,4 +1,4 @@
-from .base import Base
+from .base import Base, SCHEMA_VERSION
 from .authorship import Authorship
 from .dependency import Dependency
 from .file import File, file_hash
@@ -8,3 +8,7 @@ from .installation import Installation
 from .source import Source
 from .modding_tools import ModdingTools, ModdingToolsDependency
 from .version import Version
+from .validator import ResponseValidator
+from .setting import Setting
+from .search import MOD_SEARCH_TABLE, MOD_SEARCH_COLUMNS, mod_search
+from .trigram import ModTrigram, similarity, trigrams
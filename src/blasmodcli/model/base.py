@@ -1,5 +1,8 @@
 from sqlalchemy.orm import DeclarativeBase
 
+# Must be incremented every time a table or a column is added, changed or removed
+SCHEMA_VERSION = 4
+
 
 class Base(DeclarativeBase):
     pass
@@ -8,7 +8,6 @@ from blasmodcli.model.base import Base
 from blasmodcli.model.version import Version, VersionType
 
 
-# TODO: prevent circular dependencies
 class Dependency(Base):
     __tablename__ = "dependency"
     __table_args__ = (
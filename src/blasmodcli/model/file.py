@@ -13,11 +13,21 @@ def file_hash(file: Path) -> str:
 
 
 class File:
+    """
+    A file extracted from the archive of a mod.
+    Its hash is the one recorded when it was installed, and is only computed from the file itself when it is unknown.
+    """
 
     def __init__(self, installation: 'Installation', relpath: str, hash_digest: str | None = None):
         self.installation = installation
         self.relpath = relpath
-        self.hash = hash_digest if hash_digest is not None else file_hash(self.path)
+        self.hash_digest = hash_digest
+
+    @property
+    def hash(self) -> str:
+        if self.hash_digest is None:
+            self.hash_digest = file_hash(self.path)
+        return self.hash_digest
 
     @property
     def path(self) -> Path:
@@ -33,7 +43,8 @@ class File:
         return self.hash != self.get_current_hash()
 
     def update_hash(self):
-        self.hash = file_hash(self.path)
+        """ Marks the file as overwritten, its hash is computed again the next time it is needed. """
+        self.hash_digest = None
 
 
 from blasmodcli.model.installation import Installation
@@ -1,13 +1,32 @@
 from datetime import datetime
 from pathlib import Path
+from typing import Generator
+import os
+
+MANIFEST_SEPARATOR = " "
 
 
 class Installation:
+    """
+    The files extracted from the archive of a mod version.
+    They are listed in a manifest, with one line per file holding its hash and its path relative to the modding
+    directory of the game, separated by a space. The manifest is only read once the files are needed.
+    """
 
-    def __init__(self, file: Path, mod_version: 'ModVersion'):
+    def __init__(self, file: Path, mod_version: 'ModVersion', load: bool = False):
         self.file = file
         self.mod_version = mod_version
-        self.files: list['File'] = []
+        self._files: list['File'] | None = None if load else []
+
+    @property
+    def files(self) -> list['File']:
+        if self._files is None:
+            self._files = list(self.load())
+        return self._files
+
+    @files.setter
+    def files(self, files: list['File']):
+        self._files = files
 
     @property
     def mod(self) -> 'Mod':
@@ -20,10 +39,27 @@ class Installation:
     def get_datetime(self) -> datetime:
         return datetime.fromtimestamp(self.file.stat().st_mtime)
 
+    def load(self) -> Generator['File']:
+        """ Reads the files listed in the manifest, without reading the files themselves. """
+        with self.file.open("r") as fd:
+            for line in fd:
+                line = line.rstrip("\n")
+                if len(line) == 0:
+                    continue
+                hash_digest, relpath = line.split(MANIFEST_SEPARATOR, 1)
+                yield File(self, relpath, hash_digest)
+
+    def write(self, file: Path):
+        with file.open("w") as fd:
+            for installed_file in self.files:
+                fd.write(f"{installed_file.hash}{MANIFEST_SEPARATOR}{installed_file.relpath}\n")
+            fd.flush()
+            os.fsync(fd.fileno())
+
     def persist(self):
-        with self.file.open("w") as fd:
-            for file in self.files:
-                fd.write(f"{file.hash} {file.relpath}\n")
+        temporary_file = self.file.with_name(self.file.name + ".tmp")
+        self.write(temporary_file)
+        os.replace(temporary_file, self.file)
 
     def is_broken(self) -> bool:
         for file in self.files:
@@ -48,6 +48,7 @@ class Mod(Base):
     latest_version: Mapped['Version'] = mapped_column(VersionType)
     plugin_file_name: Mapped[str]
     artifact_name: Mapped[str]
+    content_hash: Mapped[str]
 
     dependencies: Mapped[List['Dependency']] = relationship(
         "Dependency",
@@ -63,7 +64,7 @@ class Mod(Base):
         cascade="all, delete-orphan"
     )
 
-    authors: Mapped[List['Authorship']] = relationship("Authorship", back_populates="mod")
+    authors: Mapped[List['Authorship']] = relationship("Authorship", back_populates="mod", cascade="all, delete-orphan")
 
     @property
     def full_name(self):
@@ -0,0 +1,23 @@
+from sqlalchemy import DDL, column, event, table
+
+from blasmodcli.model.base import Base
+
+MOD_SEARCH_TABLE = "mod_search"
+
+# The indexed columns, along with their weight when ranking the results: matching the name matters most
+MOD_SEARCH_COLUMNS = {
+    "name": 10.0,
+    "display_name": 10.0,
+    "authors": 5.0,
+    "description": 1.0
+}
+
+# Full-text index of the mods, whose row identifiers are the identifiers of the mods
+mod_search = table(MOD_SEARCH_TABLE, column("rowid"), *map(column, MOD_SEARCH_COLUMNS))
+
+# SQLAlchemy cannot declare virtual tables, so the index is created and dropped along with the other tables
+event.listen(Base.metadata, "after_create", DDL(
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {MOD_SEARCH_TABLE} USING fts5("
+    f"{", ".join(MOD_SEARCH_COLUMNS)}, tokenize = 'unicode61 remove_diacritics 2')"
+))
+event.listen(Base.metadata, "before_drop", DDL(f"DROP TABLE IF EXISTS {MOD_SEARCH_TABLE}"))
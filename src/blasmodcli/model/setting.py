@@ -0,0 +1,11 @@
+from sqlalchemy.orm import Mapped, mapped_column
+
+from blasmodcli.model.base import Base
+
+
+class Setting(Base):
+    """ A value that the application stores for itself between runs, identified by a key. """
+    __tablename__ = "setting"
+
+    key: Mapped[str] = mapped_column(primary_key=True)
+    value: Mapped[str]
@@ -0,0 +1,29 @@
+from sqlalchemy import ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+
+from blasmodcli.model.base import Base
+
+
+def trigrams(name: str) -> set[str]:
+    """
+    Returns the sequences of three consecutive characters of a name, which is padded so that the beginning and the end
+    of the name count as well.
+    """
+    padded = f"  {name.lower()} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def similarity(a: set[str], b: set[str]) -> float:
+    """ Returns the proportion of trigrams that two names have in common, between 0 and 1. """
+    if len(a) == 0 or len(b) == 0:
+        return 0.0
+    shared = len(a & b)
+    return shared / (len(a) + len(b) - shared)
+
+
+class ModTrigram(Base):
+    """ The trigrams of the name of a mod, to find the mods whose name is close to a mistyped one. """
+    __tablename__ = "mod_trigram"
+
+    trigram: Mapped[str] = mapped_column(primary_key=True)
+    mod_id: Mapped[int] = mapped_column(ForeignKey("mod.id"), primary_key=True)
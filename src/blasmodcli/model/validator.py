@@ -0,0 +1,15 @@
+from typing import Optional
+
+from sqlalchemy.orm import Mapped, mapped_column
+
+from blasmodcli.model.base import Base
+
+
+class ResponseValidator(Base):
+    """ The HTTP validators of the last response received for a URL, used to make conditional requests. """
+    __tablename__ = "response_validator"
+
+    url: Mapped[str] = mapped_column(primary_key=True)
+    etag: Mapped[Optional[str]] = mapped_column(default=None)
+    last_modified: Mapped[Optional[str]] = mapped_column(default=None)
+    location: Mapped[Optional[str]] = mapped_column(default=None)
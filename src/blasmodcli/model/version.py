@@ -7,6 +7,13 @@ class Version:
 
     @classmethod
     def from_tag(cls, tag: str) -> 'Version':
+        """
+        Parses a version tag, like '1.2.3' or 'v1.2.3'.
+        The components are kept as numbers, so that versions are not compared as text:
+
+        >>> Version.from_tag("1.10.0") > Version.from_tag("v1.9.0")
+        True
+        """
         v = tag.startswith("v")
         if v:
             tag = tag[1:]
@@ -17,7 +24,7 @@ class Version:
         for i, component in enumerate(components):
             if not component.isdigit():
                 raise ValueError(f"Invalid version number: component {i} is not a digit.")
-        return cls(*components, v=v)
+        return cls(*(int(component) for component in components), v=v)
 
     def __init__(self, major: int, minor: int, patch: int, v: bool = False):
         self.major = major
@@ -1,12 +1,38 @@
-from .cache import CacheRepository
+from .cache import CacheRepository, CachedArchive
 from .filesystem import FileSystemRepository
 from .installations import InstallationRepository
+from .profiles import ProfileRepository
+from .store import Store
+from .transaction import Transaction, recover
 
+from blasmodcli.model import Game
 from blasmodcli.utils import Directories
 
+STASH_DIRECTORY_NAME = ".blasmodcli-stash"
+
 
 class FileSystemRepositories:
 
     def __init__(self, directories: Directories):
         self.cache = CacheRepository(directories.cache / "mods")
         self.installations = InstallationRepository(directories.data / "installations")
+        self.profiles = ProfileRepository(directories.data / "profiles")
+        self.store = Store(directories.data / "store")
+        self.journal = directories.data / "journal.json"
+
+    def begin(self, game: Game) -> Transaction:
+        """ Starts a transaction that installs files into the modding directory of a game. """
+        transaction = Transaction(self.journal, game.modding_directory)
+        transaction.begin()
+        return transaction
+
+    def stash(self, game: Game) -> Store:
+        """
+        Returns the store keeping the files of the mods that were uninstalled by switching profiles.
+        It is located in the modding directory, so that files can be moved in and out of it with hard links.
+        """
+        return Store(game.modding_directory / STASH_DIRECTORY_NAME)
+
+    def recover(self):
+        """ Completes or discards the transaction that was interrupted the last time the application ran. """
+        recover(self.journal)
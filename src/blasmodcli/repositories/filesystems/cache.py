@@ -1,18 +1,130 @@
 from pathlib import Path
+import os
+import time
 
 from blasmodcli.model import Mod, ModVersion
 
+from blasmodcli.repositories.filesystems.entry import Entry
 from blasmodcli.repositories.filesystems.filesystem import FileSystemRepository
 
+DIGEST_SUFFIX = ".sha256"
+PARTIAL_SUFFIX = ".part"
+
+
+class CachedArchive:
+    """ An archive of the cache, with what is needed to decide whether to evict it. """
+
+    def __init__(self, entry: Entry, file: Path, size: int, last_access: float):
+        self.entry = entry
+        self.file = file
+        self.size = size
+        self.last_access = last_access
+
 
 class CacheRepository(FileSystemRepository):
+    """
+    The archives of the mods that were downloaded.
+    Each archive has an index file next to it, holding the SHA-256 digest and the size of the archive computed while
+    it was downloaded. An archive without index file was not completely downloaded, or downloaded by an older version.
+    """
 
     def __init__(self, directory: Path):
         super().__init__(directory, "zip")
 
+    def get_archives(self) -> list[CachedArchive]:
+        """ Returns every archive of the cache, with the size of its index file included in its size. """
+        archives = []
+        for entry in self.get_all_entries():
+            if entry.extension != self.default_extension:
+                continue
+            file = self.directory / entry.filename
+            digest_file = file.with_name(file.name + DIGEST_SUFFIX)
+            try:
+                stat = file.stat()
+            except FileNotFoundError:
+                continue
+            size = stat.st_size + (digest_file.stat().st_size if digest_file.exists() else 0)
+            archives.append(CachedArchive(entry, file, size, stat.st_atime))
+        return archives
+
+    def evict(self, archives: list[CachedArchive]):
+        """ Deletes archives along with their index file. """
+        for archive in archives:
+            archive.file.unlink(missing_ok=True)
+            archive.file.with_name(archive.file.name + DIGEST_SUFFIX).unlink(missing_ok=True)
+        self.invalidate()
+
+    def touch(self, mod_version: ModVersion):
+        """
+        Marks the archive of a mod version as used now, which is what the least recently used archives are evicted by.
+        The access time is set explicitly, as file systems mounted with 'noatime' or 'relatime' do not always update it.
+        """
+        file = self.file(mod_version)
+        try:
+            os.utime(file, ns=(time.time_ns(), file.stat().st_mtime_ns))
+        except FileNotFoundError:
+            pass
+
+    def digest_file(self, mod_version: ModVersion) -> Path:
+        archive = self.file(mod_version)
+        return archive.with_name(archive.name + DIGEST_SUFFIX)
+
+    def partial_file(self, mod_version: ModVersion) -> Path:
+        archive = self.file(mod_version)
+        return archive.with_name(archive.name + PARTIAL_SUFFIX)
+
+    def get_digest(self, mod_version: ModVersion) -> tuple[str, int] | None:
+        """
+        Returns the digest and size of an archive, as recorded when it was downloaded.
+        :param mod_version: The mod and version of the archive.
+        :return: The hexadecimal SHA-256 digest and the size in bytes of the archive, or None if they were not recorded.
+        """
+        try:
+            digest, size = self.digest_file(mod_version).read_text().split()
+            return digest, int(size)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def get_size_hint(self, mod: Mod) -> int | None:
+        """
+        Estimates the size of the archive of a mod before it is downloaded, from the archives of its other versions.
+        :return: The size in bytes of the archive of the most recent version in the cache, or None if there is none.
+        """
+        for version in reversed(self.get_all_versions_of(mod)):
+            recorded = self.get_digest(ModVersion(mod, version))
+            if recorded is not None:
+                return recorded[1]
+        return None
+
+    def record(self, mod_version: ModVersion, digest: str, size: int):
+        """ Writes the index file of an archive that was just downloaded. """
+        file = self.digest_file(mod_version)
+        temporary_file = file.with_name(file.name + PARTIAL_SUFFIX)
+        temporary_file.write_text(f"{digest} {size}\n")
+        os.replace(temporary_file, file)
+        self.register(mod_version)
+
+    def is_valid(self, mod_version: ModVersion) -> bool:
+        """
+        Indicates if the archive of a mod version was completely downloaded and did not change since.
+        Only the recorded size is compared, so that the archive does not need to be read again.
+        :param mod_version: The mod and version of the archive.
+        :return: True if the archive can be used.
+        """
+        recorded = self.get_digest(mod_version)
+        if recorded is None:
+            return False
+        try:
+            return self.file(mod_version).stat().st_size == recorded[1]
+        except FileNotFoundError:
+            return False
+
     def remove_all_versions(self, mod: Mod):
-        for archive in self.get_files_for(mod):
-            archive.unlink()
+        for version in self.get_all_versions_of(mod):
+            self.remove_version(ModVersion(mod, version))
 
     def remove_version(self, mod_version: ModVersion):
-        self.file(mod_version).unlink()
+        self.file(mod_version).unlink(missing_ok=True)
+        self.unregister(mod_version)
+        self.digest_file(mod_version).unlink(missing_ok=True)
+        self.partial_file(mod_version).unlink(missing_ok=True)
@@ -1,14 +1,28 @@
+from bisect import insort
 from collections.abc import Sequence, Generator
 from pathlib import Path
 from re import Match
+import os
 
 from blasmodcli.model import Game, Mod, ModVersion, Version
 from blasmodcli.repositories.filesystems.entry import Entry, FILENAME_PATTERN
 from blasmodcli.repositories.repository import IRepository
 from blasmodcli.utils import Directories
 
+IndexKey = tuple[str, str, str]
+
+
+def index_key(mod: Mod) -> IndexKey:
+    return mod.game_id, mod.source_name, mod.name
+
 
 class FileSystemRepository(IRepository[Path]):
+    """
+    A directory containing one file per version of a mod.
+    The directory is scanned once, the first time it is needed, into an index of the versions of each mod. The index is
+    kept up to date by the methods of the repository that write or delete files, files written by other means require
+    to invalidate the index.
+    """
 
     def __init__(
             self,
@@ -19,6 +33,7 @@ class FileSystemRepository(IRepository[Path]):
         self.directory = Directories.require(directory)
         self.default_extension = default_extension
         self.accepted_extensions = accepted_extensions if accepted_extensions is not None else (self.default_extension,)
+        self.versions: dict[IndexKey, list[Version]] | None = None
 
     def get_all(self) -> list[Path]:
         files = []
@@ -52,10 +67,8 @@ class FileSystemRepository(IRepository[Path]):
         return mod_versions
 
     def get_all_versions_of(self, mod: Mod) -> list[Version]:
-        versions: list[Version] = []
-        for entry in self.get_entries_for(mod):
-            versions.append(entry.version)
-        return versions
+        """ Returns the versions of a mod that have a file in the directory, from the oldest to the newest. """
+        return list(self.index().get(index_key(mod), ()))
 
     def get_entries_for(self, mod: Mod, version: Version | None = None) -> Generator[Entry]:
         for file in self.get_files_for(mod, version):
@@ -70,9 +83,9 @@ class FileSystemRepository(IRepository[Path]):
         return self.entry(file)
 
     def get_files_for(self, mod: Mod, version: Version | None = None) -> Generator[Path]:
-        for file in self.directory.glob(self.filename(mod, version)):
-            if file.is_file():
-                yield file
+        for indexed_version in self.index().get(index_key(mod), ()):
+            if version is None or indexed_version == version:
+                yield self.file(ModVersion(mod, indexed_version))
 
     def get_file_for(self, mod_version: ModVersion) -> Path | None:
         for file in self.get_files_for(mod_version.mod, mod_version.version):
@@ -80,12 +93,44 @@ class FileSystemRepository(IRepository[Path]):
         return None
 
     def get_latest_version(self, mod: Mod) -> Version | None:
-        versions = self.get_all_versions_of(mod)
-        latest = None
-        for version in versions:
-            if latest is None or version > latest:
-                latest = version
-        return latest
+        versions = self.index().get(index_key(mod))
+        if not versions:
+            return None
+        return versions[-1]
+
+    def index(self) -> dict[IndexKey, list[Version]]:
+        if self.versions is None:
+            self.versions = {}
+            with os.scandir(self.directory) as entries:
+                for dir_entry in entries:
+                    if not dir_entry.is_file():
+                        continue
+                    entry = self.entry(Path(dir_entry.path))
+                    if entry is None or entry.extension != self.default_extension:
+                        continue
+                    key = (entry.game_id, entry.source_name, entry.mod_name)
+                    insort(self.versions.setdefault(key, []), entry.version)
+        return self.versions
+
+    def invalidate(self):
+        """ Forgets the content of the directory, so that it is scanned again the next time it is needed. """
+        self.versions = None
+
+    def register(self, mod_version: ModVersion):
+        """ Adds the file of a mod version that was just written to the index. """
+        if self.versions is None:
+            return
+        versions = self.versions.setdefault(index_key(mod_version.mod), [])
+        if mod_version.version not in versions:
+            insort(versions, mod_version.version)
+
+    def unregister(self, mod_version: ModVersion):
+        """ Removes the file of a mod version that was just deleted from the index. """
+        if self.versions is None:
+            return
+        versions = self.versions.get(index_key(mod_version.mod), [])
+        if mod_version.version in versions:
+            versions.remove(mod_version.version)
 
     def entry(self, file: Path) -> Entry | None:
         match = self.match(file)
@@ -114,9 +159,10 @@ class FileSystemRepository(IRepository[Path]):
         return f"{mod.game_id}_{mod.source_name}_{mod.name}_{v}.{self.default_extension}"
 
     def has(self, mod: Mod, version: Version | None = None):
-        for _ in self.get_files_for(mod, version):
-            return True
-        return False
+        versions = self.index().get(index_key(mod), ())
+        if version is None:
+            return len(versions) != 0
+        return version in versions
 
     def match(self, file: Path) -> Match | None:
         match = FILENAME_PATTERN.match(file.name)
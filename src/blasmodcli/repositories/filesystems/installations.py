@@ -2,6 +2,7 @@ from pathlib import Path
 
 from blasmodcli.model import Game, Installation, ModVersion
 from blasmodcli.repositories.filesystems.filesystem import FileSystemRepository
+from blasmodcli.repositories.filesystems.transaction import Transaction
 
 
 class InstallationRepository(FileSystemRepository):
@@ -10,10 +11,10 @@ class InstallationRepository(FileSystemRepository):
         super().__init__(directory, "txt")
 
     def get(self, mod_version: ModVersion) -> Installation | None:
-        entry = self.get_file_for(mod_version)
-        if entry is None:
+        file = self.get_file_for(mod_version)
+        if file is None:
             return None
-        return Installation(entry, mod_version)
+        return Installation(file, mod_version, load=True)
 
     def get_upgrades(self, game: Game) -> list[ModVersion]:
         upgrades = []
@@ -25,3 +26,24 @@ class InstallationRepository(FileSystemRepository):
     def new(self, mod_version: ModVersion) -> Installation:
         installation = Installation(self.file(mod_version), mod_version)
         return installation
+
+    def stage(self, transaction: Transaction, installation: Installation, previous: Installation | None = None):
+        """
+        Writes the manifest of an installation as part of a transaction.
+        :param transaction: The transaction in which the files of the installation were staged.
+        :param installation: The installation to record.
+        :param previous: The installation that it replaces, whose manifest is deleted once committed.
+        """
+        transaction.stage_manifest(installation)
+        if previous is not None and previous.file != installation.file:
+            transaction.remove_manifest(previous)
+
+    def record(self, installation: Installation, previous: Installation | None = None):
+        """ Indexes an installation whose transaction was committed, in place of the previous one. """
+        if previous is not None:
+            self.unregister(previous.mod_version)
+        self.register(installation.mod_version)
+
+    def delete(self, installation: Installation):
+        installation.delete()
+        self.unregister(installation.mod_version)
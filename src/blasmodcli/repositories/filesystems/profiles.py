@@ -0,0 +1,42 @@
+from pathlib import Path
+
+from blasmodcli.model import Game
+from blasmodcli.repositories.filesystems.transaction import write_durably
+
+PROFILE_EXTENSION = "txt"
+
+
+class ProfileRepository:
+    """
+    The named sets of mod versions of each game, that can be installed at once.
+    Each profile is a file in the directory of its game, listing the full name of one mod version per line, like
+    'source/mod:1.0.0'.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+
+    def file(self, game: Game, name: str) -> Path:
+        return self.directory / game.id / f"{name}.{PROFILE_EXTENSION}"
+
+    def get_names(self, game: Game) -> list[str]:
+        directory = self.directory / game.id
+        if not directory.is_dir():
+            return []
+        return sorted(file.stem for file in directory.glob(f"*.{PROFILE_EXTENSION}"))
+
+    def has(self, game: Game, name: str) -> bool:
+        return self.file(game, name).is_file()
+
+    def read(self, game: Game, name: str) -> list[str]:
+        """ Returns the full names of the mod versions of a profile. """
+        lines = self.file(game, name).read_text().splitlines()
+        return [line.strip() for line in lines if len(line.strip()) != 0]
+
+    def write(self, game: Game, name: str, full_names: list[str]):
+        file = self.file(game, name)
+        file.parent.mkdir(parents=True, exist_ok=True)
+        write_durably(file, "".join(f"{full_name}\n" for full_name in full_names))
+
+    def delete(self, game: Game, name: str):
+        self.file(game, name).unlink(missing_ok=True)
@@ -0,0 +1,157 @@
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+import errno
+import hashlib
+import os
+import shutil
+
+from blasmodcli.model.file import FILE_HASH_ALGORITHM
+from blasmodcli.repositories.filesystems.transaction import write_durably
+
+# The request of the Linux 'ioctl' system call that makes a file share the blocks of another, on file systems such as
+# Btrfs or XFS
+FICLONE = 0x40049409
+
+STORE_CHUNK_SIZE = 256 * 1024
+
+
+def reflink(source: Path, destination: Path) -> bool:
+    """
+    Copies a file by sharing its blocks with the copy, which only works on some file systems.
+    :return: False if the file system or the platform do not support it.
+    """
+    try:
+        import fcntl
+    except ImportError:
+        return False
+    with source.open("rb") as source_fd, destination.open("wb") as destination_fd:
+        try:
+            fcntl.ioctl(destination_fd.fileno(), FICLONE, source_fd.fileno())
+            return True
+        except OSError:
+            pass
+    destination.unlink(missing_ok=True)
+    return False
+
+
+class Store:
+    """
+    The files extracted from the archives of mods, each kept once by the hash of its content.
+    Installations are made of hard links to the files of the store, so that installing a version that was extracted
+    before does not need to decompress anything, and that the files of several installations take no space twice.
+    When the modding directory is on another file system, files are copied with reflinks if possible, or entirely.
+    For each archive, the store also keeps the hash of each of its members, so that they are found without reading it.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.objects = directory / "objects"
+        self.archives = directory / "archives"
+
+    def object(self, digest: str) -> Path:
+        return self.objects / digest[:2] / digest
+
+    def manifest(self, archive_digest: str) -> Path:
+        return self.archives / f"{archive_digest}.txt"
+
+    def get_members(self, archive_digest: str) -> dict[str, str] | None:
+        """
+        Returns the hash of each member of an archive that was previously added to the store.
+        :param archive_digest: The digest of the archive, as recorded when it was downloaded.
+        :return: The hash of each file of the archive by relative path, or None if some of them are not in the store.
+        """
+        try:
+            lines = self.manifest(archive_digest).read_text().splitlines()
+        except FileNotFoundError:
+            return None
+        members = {}
+        for line in lines:
+            digest, relpath = line.split(" ", 1)
+            if not self.object(digest).is_file():
+                return None
+            members[relpath] = digest
+        return members
+
+    def set_members(self, archive_digest: str, members: dict[str, str]):
+        self.archives.mkdir(parents=True, exist_ok=True)
+        content = "".join(f"{digest} {relpath}\n" for relpath, digest in members.items())
+        write_durably(self.manifest(archive_digest), content)
+
+    def add(self, source, chunk_size: int = STORE_CHUNK_SIZE) -> str:
+        """
+        Writes the content of a file to the store, unless the store already has it.
+        :param source: A binary file object, read until its end.
+        :param chunk_size: The maximum number of bytes read and written at once.
+        :return: The hexadecimal digest of the content.
+        """
+        self.objects.mkdir(parents=True, exist_ok=True)
+        digest = hashlib.new(FILE_HASH_ALGORITHM)
+        with NamedTemporaryFile(dir=self.objects, prefix=".tmp-", delete=False) as temporary_file:
+            try:
+                while chunk := source.read(chunk_size):
+                    temporary_file.write(chunk)
+                    digest.update(chunk)
+                temporary_file.flush()
+                os.fsync(temporary_file.fileno())
+            except BaseException:
+                os.unlink(temporary_file.name)
+                raise
+        hex_digest = digest.hexdigest()
+        file = self.object(hex_digest)
+        if file.exists():
+            os.unlink(temporary_file.name)
+        else:
+            file.parent.mkdir(exist_ok=True)
+            os.replace(temporary_file.name, file)
+        return hex_digest
+
+    def keep(self, path: Path, digest: str):
+        """
+        Adds a file to the store under a known hash, as a hard link to it if possible, so that it can be restored after
+        being deleted.
+        """
+        file = self.object(digest)
+        if file.exists():
+            return
+        file.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.link(path, file)
+        except OSError as e:
+            if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP):
+                raise
+            shutil.copyfile(path, file)
+
+    def is_linked(self, digest: str, path: Path) -> bool:
+        """ Indicates if a file is a hard link to a file of the store, which makes it identical without reading it. """
+        try:
+            return os.path.samefile(self.object(digest), path)
+        except OSError:
+            return False
+
+    def link(self, digest: str, path: Path):
+        """ Creates a file with the content of a file of the store, as a hard link, a reflink or a copy. """
+        source = self.object(digest)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.link(source, path)
+            return
+        except OSError as e:
+            if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP):
+                raise
+        if not reflink(source, path):
+            shutil.copyfile(source, path)
+
+    def prune(self, keep: set[str] = frozenset()) -> int:
+        """
+        Deletes the files of the store that no installation links to anymore.
+        Files copied to another file system are not links, so they are deleted as well.
+        :param keep: The hashes of the files to keep even if they are not linked.
+        :return: The number of bytes freed.
+        """
+        freed = 0
+        for file in self.objects.glob("*/*") if self.objects.is_dir() else ():
+            stat = file.stat()
+            if stat.st_nlink == 1 and file.name not in keep:
+                file.unlink()
+                freed += stat.st_size
+        return freed
@@ -0,0 +1,203 @@
+from pathlib import Path
+import fcntl
+import json
+import os
+import shutil
+
+from blasmodcli.model import Installation
+from blasmodcli.utils import Directories, logger
+
+STAGING_DIRECTORY_NAME = ".blasmodcli-staging"
+STAGED_MANIFEST_SUFFIX = ".staged"
+LOCK_SUFFIX = ".lock"
+
+
+class TransactionState:
+    PREPARED = "prepared"
+    COMMITTING = "committing"
+
+
+def write_durably(file: Path, content: str):
+    """ Writes a file through a temporary file renamed over it, so that it is either fully written or not at all. """
+    temporary_file = file.with_name(file.name + ".tmp")
+    with temporary_file.open("w") as fd:
+        fd.write(content)
+        fd.flush()
+        os.fsync(fd.fileno())
+    os.replace(temporary_file, file)
+
+
+def lock_journal(journal: Path, blocking: bool = True) -> int | None:
+    """
+    Takes the exclusive lock of a journal, held by the process running its transaction until it ends.
+    The lock is released when its file descriptor is closed, including when the process stops.
+    :param journal: The journal to lock.
+    :param blocking: Whether to wait for the process holding the lock to release it.
+    :return: The file descriptor holding the lock, or None if another process holds it and blocking is False.
+    """
+    fd = os.open(journal.with_name(journal.name + LOCK_SUFFIX), os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        os.close(fd)
+        return None
+    except BaseException:
+        os.close(fd)
+        raise
+    return fd
+
+
+def delete_files(directory: Path, relpaths: list[str]):
+    """ Deletes files from a directory, and the directories that they leave empty. """
+    for relpath in relpaths:
+        path = directory / relpath
+        path.unlink(missing_ok=True)
+        for parent in path.parents:
+            if parent == directory or not parent.is_relative_to(directory):
+                break
+            try:
+                parent.rmdir()
+            except OSError:
+                break
+
+
+class Transaction:
+    """
+    Installs files into a directory all at once, or not at all.
+    Files are first written to a staging directory on the same file system, then moved to their destination with
+    renames once every file is ready. A journal records the progress of the transaction: if the application stops
+    before the transaction is committed, the staged files are discarded, and if it stops while it is being committed,
+    the remaining renames are replayed. Either way, this happens the next time the application starts.
+    The journal is locked while the transaction runs, so that other processes neither start another transaction nor
+    recover this one in the meantime.
+    """
+
+    def __init__(self, journal: Path, destination: Path):
+        self.journal = journal
+        self.destination = destination
+        self.staging = destination / STAGING_DIRECTORY_NAME
+        self.state = TransactionState.PREPARED
+        self.deleted_files: list[str] = []
+        self.manifests: list[str] = []
+        self.obsolete_manifests: list[str] = []
+        self.lock: int | None = None
+
+    @classmethod
+    def load(cls, journal: Path) -> 'Transaction':
+        with journal.open("r") as fd:
+            data = json.load(fd)
+        transaction = cls(journal, Path(data["destination"]))
+        transaction.deleted_files = data["deleted_files"]
+        transaction.manifests = data["manifests"]
+        transaction.obsolete_manifests = data["obsolete_manifests"]
+        transaction.state = data["state"]
+        return transaction
+
+    def save(self, state: str):
+        self.state = state
+        data = {
+            "state": state,
+            "destination": str(self.destination),
+            "deleted_files": self.deleted_files,
+            "manifests": self.manifests,
+            "obsolete_manifests": self.obsolete_manifests
+        }
+        write_durably(self.journal, json.dumps(data))
+
+    def begin(self):
+        self.lock = lock_journal(self.journal, blocking=False)
+        if self.lock is None:
+            logger.warning("Another installation is in progress, waiting for it to finish...")
+            self.lock = lock_journal(self.journal)
+        # A transaction may have been interrupted since the application started
+        restore(self.journal)
+        shutil.rmtree(self.staging, ignore_errors=True)
+        self.staging.mkdir(parents=True)
+        self.save(TransactionState.PREPARED)
+
+    def stage_directory(self, name: str) -> Path:
+        """ Returns a directory in which files can be staged, and which mirrors the destination directory. """
+        return Directories.require(self.staging / name)
+
+    def delete(self, relpaths: set[str]):
+        self.deleted_files.extend(relpaths)
+
+    def stage_manifest(self, installation: Installation):
+        """ Writes the manifest of an installation next to its final location, to be renamed once committed. """
+        staged_manifest = installation.file.with_name(installation.file.name + STAGED_MANIFEST_SUFFIX)
+        self.manifests.append(str(installation.file))
+        # The staged manifest must be known before being written, so that it is deleted if the transaction is aborted
+        self.save(TransactionState.PREPARED)
+        staged_manifest.parent.mkdir(parents=True, exist_ok=True)
+        installation.write(staged_manifest)
+
+    def remove_manifest(self, installation: Installation):
+        self.obsolete_manifests.append(str(installation.file))
+
+    def commit(self):
+        self.save(TransactionState.COMMITTING)
+        self.replay()
+
+    def replay(self):
+        """ Moves the staged files to their destination, which only moves the ones left if it was interrupted. """
+        for directory in sorted(self.staging.iterdir()) if self.staging.is_dir() else ():
+            for staged_file in sorted(path for path in directory.rglob("*") if path.is_file()):
+                file = self.destination / staged_file.relative_to(directory)
+                file.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(staged_file, file)
+        delete_files(self.destination, self.deleted_files)
+        for manifest in map(Path, self.manifests):
+            staged_manifest = manifest.with_name(manifest.name + STAGED_MANIFEST_SUFFIX)
+            if staged_manifest.exists():
+                os.replace(staged_manifest, manifest)
+        for manifest in map(Path, self.obsolete_manifests):
+            if str(manifest) not in self.manifests:
+                manifest.unlink(missing_ok=True)
+        self.end()
+
+    def rollback(self):
+        """ Discards the staged files and manifests, leaving the destination as it was before the transaction. """
+        for manifest in map(Path, self.manifests):
+            manifest.with_name(manifest.name + STAGED_MANIFEST_SUFFIX).unlink(missing_ok=True)
+        self.end()
+
+    def end(self):
+        shutil.rmtree(self.staging, ignore_errors=True)
+        self.journal.unlink(missing_ok=True)
+        if self.lock is not None:
+            os.close(self.lock)
+            self.lock = None
+
+
+def recover(journal: Path):
+    """
+    Completes or cancels the transaction that was interrupted the last time the application ran, if any.
+    Nothing is done while another process holds the journal, as its transaction is still running.
+    :param journal: The journal of the transaction.
+    """
+    if not journal.exists():
+        return
+    lock = lock_journal(journal, blocking=False)
+    if lock is None:
+        return
+    try:
+        restore(journal)
+    finally:
+        os.close(lock)
+
+
+def restore(journal: Path):
+    """ Completes or cancels an interrupted transaction, whose journal must be locked by the caller. """
+    if not journal.exists():
+        return
+    try:
+        transaction = Transaction.load(journal)
+    except (OSError, ValueError, KeyError) as e:
+        logger.error(f"Could not read the journal of the interrupted installation '{journal}': {e}")
+        return
+    if transaction.state == TransactionState.COMMITTING:
+        logger.warning("The previous installation was interrupted while being committed, completing it.")
+        transaction.replay()
+    else:
+        logger.warning("The previous installation was interrupted, discarding it.")
+        transaction.rollback()
@@ -4,7 +4,9 @@ from sqlalchemy.orm import Session
 from .dependency import DependencyRepository
 from .game import GameRepository
 from .mod import ModRepository
+from .setting import SettingRepository
 from .source import ModSourceRepository
+from .validator import ValidatorRepository
 
 
 class TableRepositories:
@@ -14,7 +16,9 @@ class TableRepositories:
         self.dependencies = DependencyRepository(self.session)
         self.games = GameRepository(self.session)
         self.mods = ModRepository(self.session)
+        self.settings = SettingRepository(self.session)
         self.sources = ModSourceRepository(self.session)
+        self.validators = ValidatorRepository(self.session)
 
     def commit(self):
         self.session.commit()
@@ -1,7 +1,8 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 
-from blasmodcli.model import Dependency
+from blasmodcli.model import Dependency, Game, Mod
 from blasmodcli.repositories.tables.table import TableRepository
+from blasmodcli.utils.resolver import DependencyGraph
 
 
 class DependencyRepository(TableRepository):
@@ -9,16 +10,30 @@ class DependencyRepository(TableRepository):
     def __init__(self, session: Session):
         super().__init__(session, Dependency)
 
-    def update_all(self, dependencies: list[Dependency]):
-        for dependency in dependencies:
-            self.update(dependency)
+    def delete_all_of(self, mod_ids: list[int]):
+        """ Deletes the dependencies of the given mods, but not the dependencies other mods have on them. """
+        self.delete_where_in(Dependency.mod_id, mod_ids)
 
-    def update(self, dependency: Dependency):
-        query = self.session.query(Dependency).filter(
-            Dependency.mod_id == dependency.mod_id,
-            Dependency.dependency_id == dependency.dependency_id
-        )
-        in_db = query.one_or_none()
-        if in_db is None:
-            self.session.add(dependency)
-        self.session.commit()
+    def get_graph(self, game: Game) -> DependencyGraph:
+        """ Loads every dependency between the mods of a game, along with the mods, in a single query. """
+        dependencies = self.session.query(Dependency).join(
+            Mod, Dependency.mod_id == Mod.id
+        ).filter(
+            Mod.game_id == game.id
+        ).options(
+            joinedload(Dependency.mod),
+            joinedload(Dependency.dependency)
+        ).all()
+        return DependencyGraph(dependencies)
+
+    def upsert_all(self, dependencies: list[Dependency]):
+        rows = [
+            {
+                "mod_id": dependency.mod_id,
+                "dependency_id": dependency.dependency_id,
+                "minimum_version": dependency.minimum_version,
+                "maximum_version": dependency.maximum_version
+            }
+            for dependency in dependencies
+        ]
+        self.upsert(rows, ["mod_id", "dependency_id"])
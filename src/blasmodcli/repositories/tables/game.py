@@ -20,9 +20,24 @@ class GameRepository(TableRepository):
             names.append(result.id)
         return names
 
-    def update(self, game: Game):
-        query = self.session.query(Game).filter(Game.id == game.id)
-        in_db = query.one_or_none()
-        if in_db is None:
-            self.session.add(game)
-        self.session.commit()
+    def upsert_all(self, games: list[Game]):
+        """ Writes the games and their modding tools, updating the ones that changed in the configuration files. """
+        rows = [
+            {
+                "id": game.id,
+                "title": game.title,
+                "developer": game.developer,
+                "publisher": game.publisher,
+                "steamapp_id": game.steamapp_id,
+                "linux_native": game.linux_native,
+                "saves_directory": game.saves_directory
+            }
+            for game in games
+        ]
+        self.upsert(rows, ["id"])
+
+        all_modding_tools = []
+        for game in games:
+            game.modding_tools.game_id = game.id
+            all_modding_tools.append(game.modding_tools)
+        self.modding_tools.upsert_all(all_modding_tools)
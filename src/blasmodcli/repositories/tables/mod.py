@@ -1,10 +1,26 @@
 from typing import Optional
 
-from sqlalchemy import desc, or_
+from sqlalchemy import desc, func, insert, inspect, literal_column, select
 from sqlalchemy.orm import Session
 
-from blasmodcli.model import Source, Mod, Game
-from blasmodcli.repositories.tables.table import TableRepository
+from blasmodcli.model import Authorship, Dependency, Game, Mod, ModTrigram, Source, MOD_SEARCH_TABLE, MOD_SEARCH_COLUMNS, mod_search, similarity, trigrams
+from blasmodcli.repositories.tables.table import TableRepository, batches, MAX_PARAMETERS_PER_STATEMENT
+
+MOD_KEY = ["game_id", "source_name", "name"]
+
+# The minimum similarity of the name of a mod with a mistyped name for it to be suggested
+MIN_SIMILARITY = 0.2
+
+# The number of mods sharing the most trigrams with a mistyped name, whose similarity is computed
+MAX_CANDIDATES = 20
+
+
+def to_search_query(terms: list[str]) -> str:
+    """
+    Converts terms to a full-text search query, in which every term must appear, at any place.
+    Every term is quoted, so that punctuation is not interpreted, and matches the words that start with it.
+    """
+    return " ".join(f"\"{term.replace("\"", "\"\"")}\"*" for term in terms)
 
 
 class ModRepository(TableRepository):
@@ -12,9 +28,17 @@ class ModRepository(TableRepository):
     def __init__(self, session: Session):
         super().__init__(session, Mod)
 
-    def add_all(self, mods: list[Mod]):
-        self.session.add_all(mods)
-        self.session.commit()
+    def delete_all(self, mods: list[Mod]):
+        """ Deletes mods loaded from the database, along with their authors and every dependency from or to them. """
+        ids = [mod.id for mod in mods]
+        self.delete_where_in(Dependency.mod_id, ids)
+        self.delete_where_in(Dependency.dependency_id, ids)
+        self.delete_where_in(Authorship.mod_id, ids)
+        self.delete_where_in(mod_search.c.rowid, ids)
+        self.delete_where_in(ModTrigram.mod_id, ids)
+        self.delete_where_in(Mod.id, ids)
+        for mod in mods:
+            self.session.expunge(mod)
 
     def get_all_by_name(self, game: Game, name: str) -> list[type[Mod]]:
         return self.session.query(Mod).filter(
@@ -22,6 +46,12 @@ class ModRepository(TableRepository):
             Mod.name == name
         ).all()
 
+    def get_all_by_source(self, source: Source) -> list[type[Mod]]:
+        return self.session.query(Mod).filter(
+            Mod.game_id == source.game_id,
+            Mod.source_name == source.name
+        ).all()
+
     def get_by_name(self, source: Source, name: str) -> type[Mod]:
         return self.session.query(Mod).filter(
             Mod.game_id == source.game_id,
@@ -29,28 +59,90 @@ class ModRepository(TableRepository):
             Mod.name == name
         ).one()
 
-    def search(self, game: Game, source: Optional[str], pattern: str) -> list[type[Mod]]:
-        query = self.session.query(Mod).filter(
-            Mod.game_id == game.id
-        ).filter(or_(
-            Mod.name.ilike(pattern),
-            Mod.description.ilike(pattern)
-        ))
+    def get_similar(self, game: Game, name: str, limit: int = 5) -> list[type[Mod]]:
+        """
+        Finds the mods whose name is the closest to the given one, to suggest them when a name is mistyped.
+        The mods that share the most trigrams with the name are looked up with the trigram index, then ranked by
+        similarity.
+        """
+        name_trigrams = trigrams(name)
+        shared = func.count().label("shared")
+        candidates = self.session.query(Mod).join(
+            ModTrigram, ModTrigram.mod_id == Mod.id
+        ).filter(
+            Mod.game_id == game.id,
+            ModTrigram.trigram.in_(name_trigrams)
+        ).group_by(Mod.id).order_by(desc(shared), Mod.name).add_columns(shared).limit(MAX_CANDIDATES).all()
+
+        scored = [(similarity(name_trigrams, trigrams(mod.name)), mod) for mod, _ in candidates]
+        scored.sort(key=lambda pair: (-pair[0], pair[1].name))
+        return [mod for score, mod in scored if score >= MIN_SIMILARITY][:limit]
+
+    def index(self, mods: list[Mod]):
+        """
+        Writes the name, description and authors of mods to the full-text index, and the trigrams of their name to the
+        trigram index, replacing their previous entries.
+        """
+        mod_ids = [mod.id for mod in mods]
+        self.delete_where_in(ModTrigram.mod_id, mod_ids)
+        trigram_rows = [{"trigram": trigram, "mod_id": mod.id} for mod in mods for trigram in trigrams(mod.name)]
+        self.upsert(trigram_rows, ["trigram", "mod_id"], table=ModTrigram.__table__)
+
+        self.delete_where_in(mod_search.c.rowid, mod_ids)
+        for batch in batches(mod_ids, MAX_PARAMETERS_PER_STATEMENT):
+            self.session.execute(insert(mod_search).from_select(
+                ["rowid", *MOD_SEARCH_COLUMNS],
+                select(
+                    Mod.id,
+                    Mod.name,
+                    Mod.display_name,
+                    func.coalesce(func.group_concat(Authorship.name, " "), ""),
+                    Mod.description
+                ).outerjoin(Authorship).where(Mod.id.in_(batch)).group_by(Mod.id)
+            ))
+
+    def search(self, game: Game, source: Optional[str], terms: list[str]) -> list[type[Mod]]:
+        """
+        Finds the mods whose name, description or authors contain words starting with every given term, the most
+        relevant ones first. Every mod is returned if there is no term.
+        """
+        query = self.session.query(Mod).filter(Mod.game_id == game.id)
         if source is not None:
             query = query.filter(Mod.source_name == source)
-        return query.order_by(Mod.source_name, desc(Mod.is_library), Mod.name).all()
+        if len(terms) == 0:
+            return query.order_by(Mod.source_name, desc(Mod.is_library), Mod.name).all()
 
-    def update_all(self, mods: list[Mod]):
+        index = literal_column(MOD_SEARCH_TABLE)
+        return query.join(
+            mod_search, mod_search.c.rowid == Mod.id
+        ).filter(
+            index.op("MATCH")(to_search_query(terms))
+        ).order_by(
+            func.bm25(index, *MOD_SEARCH_COLUMNS.values()), Mod.name
+        ).all()
+
+    def upsert_all(self, mods: list[Mod]):
+        """
+        Writes a batch of mods, updating the mods that already exist, identified by their name, source and game.
+        The mods that were freshly parsed get the identifier of the row they were written to, and their authors replace
+        the previous ones. The mods already loaded from the database keep their authors.
+        :param mods: The mods to write, either transient or loaded from the database.
+        """
+        columns = [column.key for column in Mod.__table__.columns if not column.primary_key]
+        rows = [{column: getattr(mod, column) for column in columns} for mod in mods]
+        results = self.upsert(rows, MOD_KEY, returning=(Mod.id, Mod.game_id, Mod.source_name, Mod.name))
+        ids = {(game_id, source_name, name): mod_id for mod_id, game_id, source_name, name in results}
+
+        parsed_mods = []
         for mod in mods:
-            self.update(mod)
-
-    def update(self, mod: Mod):
-        query = self.session.query(Mod).filter(
-            Mod.game_id == mod.game_id,
-            Mod.source_name == mod.source_name,
-            Mod.name == mod.name
-        )
-        in_db = query.one_or_none()
-        if in_db is None:
-            self.session.add(mod)
-        self.session.commit()
+            if inspect(mod).persistent:
+                # The values were written already, expiring them avoids writing them a second time when committing
+                self.session.expire(mod)
+            else:
+                mod.id = ids[(mod.game_id, mod.source_name, mod.name)]
+                parsed_mods.append(mod)
+
+        self.delete_where_in(Authorship.mod_id, [mod.id for mod in parsed_mods])
+        author_rows = [{"mod_id": mod.id, "name": author.name} for mod in parsed_mods for author in mod.authors]
+        self.upsert(author_rows, ["mod_id", "name"], table=Authorship.__table__)
+        self.index(parsed_mods)
@@ -1,6 +1,6 @@
 from sqlalchemy.orm import Session
 
-from blasmodcli.model import ModdingTools
+from blasmodcli.model import ModdingTools, ModdingToolsDependency
 from blasmodcli.repositories.tables.table import TableRepository
 
 
@@ -9,9 +9,25 @@ class ModdingToolsRepository(TableRepository):
     def __init__(self, session: Session):
         super().__init__(session, ModdingTools)
 
-    def update(self, modding_tools: ModdingTools):
-        query = self.session.query(ModdingTools).filter(ModdingTools.game_id == modding_tools.game_id)
-        in_db = query.one_or_none()
-        if in_db is None:
-            self.session.add(modding_tools)
-        self.session.commit()
+    def upsert_all(self, all_modding_tools: list[ModdingTools]):
+        """ Writes the modding tools of games and replaces their dependencies, the games must already be written. """
+        rows = [
+            {
+                "game_id": modding_tools.game_id,
+                "mod_loader": modding_tools.mod_loader,
+                "format": modding_tools.format,
+                "url": modding_tools.url,
+                "author": modding_tools.author,
+                "script_filename": modding_tools.script_filename
+            }
+            for modding_tools in all_modding_tools
+        ]
+        self.upsert(rows, ["game_id"])
+
+        self.delete_where_in(ModdingToolsDependency.game_id, [row["game_id"] for row in rows])
+        dependency_rows = [
+            {"game_id": modding_tools.game_id, "name": dependency.name, "display_name": dependency.display_name}
+            for modding_tools in all_modding_tools
+            for dependency in modding_tools.dependencies
+        ]
+        self.upsert(dependency_rows, ["game_id", "name"], table=ModdingToolsDependency.__table__)
@@ -0,0 +1,18 @@
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from blasmodcli.model import Setting
+from blasmodcli.repositories.tables.table import TableRepository
+
+
+class SettingRepository(TableRepository):
+
+    def __init__(self, session: Session):
+        super().__init__(session, Setting)
+
+    def get(self, key: str) -> Optional[str]:
+        return self.session.query(Setting.value).filter(Setting.key == key).scalar()
+
+    def set(self, key: str, value: str):
+        self.upsert([{"key": key, "value": value}], ["key"])
@@ -18,16 +18,9 @@ class ModSourceRepository(TableRepository):
             Source.name == name
         ).one_or_none()
 
-    def update_all(self, sources: list[Source]):
-        for source in sources:
-            self.update(source)
-
-    def update(self, source: Source):
-        query = self.session.query(Source).filter(
-            Source.game_id == source.game_id,
-            Source.name == source.name
-        )
-        in_db = query.one_or_none()
-        if in_db is None:
-            self.session.add(source)
-        self.session.commit()
+    def upsert_all(self, sources: list[Source]):
+        rows = [
+            {"game_id": source.game_id, "name": source.name, "format": source.format, "url": source.url, "maintainer": source.maintainer}
+            for source in sources
+        ]
+        self.upsert(rows, ["game_id", "name"])
@@ -1,7 +1,19 @@
-from sqlalchemy.orm import Session
+from typing import Any, Generator, Sequence
+
+from sqlalchemy import ColumnClause, Row, Table, delete
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import InstrumentedAttribute, Session
 
 from blasmodcli.repositories.repository import IRepository, T
 
+# The lowest limit of bound parameters per statement among the SQLite versions still in use
+MAX_PARAMETERS_PER_STATEMENT = 999
+
+
+def batches(rows: Sequence[Any], size: int) -> Generator[Sequence[Any]]:
+    for i in range(0, len(rows), size):
+        yield rows[i:i + size]
+
 
 class TableRepository(IRepository):
 
@@ -11,3 +23,40 @@ class TableRepository(IRepository):
 
     def get_all(self) -> list[T]:
         return self.session.query(self.table).all()
+
+    def upsert(
+            self,
+            rows: list[dict[str, Any]],
+            index_elements: Sequence[str],
+            returning: Sequence[InstrumentedAttribute] = (),
+            table: Table | None = None) -> list[Row]:
+        """
+        Inserts rows into a table, and updates the rows that already exist instead, without committing.
+        Rows are written with as few statements as possible, instead of looking up and writing each row separately.
+        :param rows: The values of the columns of each row, identified by their name.
+        :param index_elements: The names of the columns of the unique constraint that identifies existing rows.
+        :param returning: The columns to return for every row written.
+        :param table: The table in which to write, the table of the repository by default.
+        :return: The values of the returned columns, in no particular order.
+        """
+        if len(rows) == 0:
+            return []
+        table = self.table.__table__ if table is None else table
+        results = []
+        for batch in batches(rows, max(1, MAX_PARAMETERS_PER_STATEMENT // len(rows[0]))):
+            statement = insert(table).values(batch)
+            updated_columns = {name: statement.excluded[name] for name in rows[0] if name not in index_elements}
+            if len(updated_columns) == 0:
+                statement = statement.on_conflict_do_nothing(index_elements=index_elements)
+            else:
+                statement = statement.on_conflict_do_update(index_elements=index_elements, set_=updated_columns)
+            if len(returning) == 0:
+                self.session.execute(statement)
+            else:
+                results.extend(self.session.execute(statement.returning(*returning)).all())
+        return results
+
+    def delete_where_in(self, column: InstrumentedAttribute | ColumnClause, values: Sequence[Any]):
+        """ Deletes the rows of a table whose value for the given column is one of the given values, without committing. """
+        for batch in batches(values, MAX_PARAMETERS_PER_STATEMENT):
+            self.session.execute(delete(column.table).where(column.in_(batch)))
@@ -0,0 +1,27 @@
+from sqlalchemy.orm import Session
+
+from blasmodcli.model import ResponseValidator
+from blasmodcli.repositories.tables.table import TableRepository
+
+
+class ValidatorRepository(TableRepository):
+
+    def __init__(self, session: Session):
+        super().__init__(session, ResponseValidator)
+        self.validators: dict[str, ResponseValidator] | None = None
+
+    def get(self, url: str) -> ResponseValidator:
+        """
+        Returns the validators stored for a URL, creating them if the URL has never been requested before.
+        Every validator is loaded at once on the first call, so that looking up hundreds of URLs costs a single query.
+        :param url: The URL that is about to be requested.
+        :return: The validators of the URL, attached to the session.
+        """
+        if self.validators is None:
+            self.validators = {validator.url: validator for validator in self.get_all()}
+        validator = self.validators.get(url)
+        if validator is None:
+            validator = ResponseValidator(url=url)
+            self.session.add(validator)
+            self.validators[url] = validator
+        return validator
@@ -56,7 +56,8 @@ class Argument:
         has_default = self.default is not None
         action_is_not_store = self.get_action() != "store"
         has_multiple_names = len(self.names) > 1
-        return has_default or action_is_not_store or has_multiple_names
+        has_flag = any(name.startswith("-") for name in self.names)
+        return has_default or action_is_not_store or has_multiple_names or has_flag
 
     def add_argument_to(self, parser: ArgumentParser):
         kwargs = {
@@ -71,4 +72,8 @@ class Argument:
         if self.nargs:
             kwargs["nargs"] = self.nargs
 
+        # Only plain classes can convert the string values, annotations like 'list[str]' or 'Optional[str]' cannot
+        if kwargs["action"] == "store" and isinstance(self.type, type):
+            kwargs["type"] = self.type
+
         parser.add_argument(*self.names, **kwargs)
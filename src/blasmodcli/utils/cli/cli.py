@@ -1,4 +1,6 @@
 from argparse import ArgumentParser
+from importlib import import_module
+import sys
 from typing import Dict, Sequence
 
 from blasmodcli.model.game import Game
@@ -13,12 +15,38 @@ class CommandLineInterface:
         self.parser = ArgumentParser()
         self.subparsers = self.parser.add_subparsers(dest="handler")
         self.handlers: 'Dict[str, MetaCommandHandler]' = {}
+        self.lazy_handlers: dict[str, str] = {}
 
     def add_handler(self, handler: 'MetaCommandHandler'):
         handler.add_subparser_to(self.subparsers)
         self.handlers[handler.command] = handler
 
+    def add_lazy_handler(self, command: str, path: str):
+        """
+        Registers a handler without importing it yet.
+        :param command: The name of the command of the handler.
+        :param path: The full name of the module of the handler, followed by the name of its class.
+        """
+        self.lazy_handlers[command] = path
+
+    def load_handler(self, command: str):
+        """ Imports a handler that was registered lazily, and adds its command to the parser. """
+        module_name, class_name = self.lazy_handlers.pop(command).rsplit(".", 1)
+        self.add_handler(getattr(import_module(module_name), class_name))
+
+    def load_handlers_for(self, args: Sequence[str]):
+        """
+        Imports the handler of the command that is run, if it is known.
+        Otherwise, every handler is imported, so that the help and the errors of the parser list every command.
+        """
+        if len(args) != 0 and args[0] in self.lazy_handlers:
+            self.load_handler(args[0])
+            return
+        for command in list(self.lazy_handlers):
+            self.load_handler(command)
+
     def parse_args(self, game: 'Game', args: Sequence[str] | None = None) -> int:
+        self.load_handlers_for(args if args is not None else sys.argv[1:])
         namespace = self.parser.parse_args(args)
         if namespace.handler:
             handler = self.handlers[namespace.handler]
@@ -1,4 +1,5 @@
 from .config import Configuration
 from .directory import ConfigurationDirectory
 from .games import GameConfiguration
+from .general import GeneralConfiguration
 from .sources import SourceConfiguration
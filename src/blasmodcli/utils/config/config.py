@@ -3,6 +3,7 @@ from pathlib import Path
 from blasmodcli.repositories import TableRepositories
 from blasmodcli.utils import Directories
 from blasmodcli.utils.config.games import GameConfiguration
+from blasmodcli.utils.config.general import GeneralConfiguration
 from blasmodcli.utils.config.sources import SourceConfiguration
 
 
@@ -12,5 +13,6 @@ class Configuration:
         self.directory = Directories.require(directory)
         self.tables = tables
         self.file = directory / "general.toml"
+        self.general = GeneralConfiguration(self.file)
         self.games = GameConfiguration(self.directory / "games", self.tables.games)
         self.sources = SourceConfiguration(self.directory / "sources", self.tables.sources)
@@ -2,6 +2,7 @@ from abc import abstractmethod, ABC
 from pathlib import Path
 from tomllib import TOMLDecodeError
 from typing import Any, Generic, TypeVar, Generator
+import hashlib
 import tomllib
 
 from blasmodcli.exceptions.utils import ConfigurationException, MissingFieldException, InvalidFieldTypeException
@@ -31,6 +32,17 @@ class ConfigurationDirectory(ABC, Generic[T]):
             if entry.is_file():
                 yield entry
 
+    def fingerprint(self) -> str:
+        """
+        Identifies the current state of the configuration files from their names, sizes and modification times, without
+        reading them.
+        """
+        digest = hashlib.sha256()
+        for file in sorted(self.files()):
+            stat = file.stat()
+            digest.update(f"{file.relative_to(self.directory)}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode())
+        return digest.hexdigest()
+
     def load_all(self):
         for file in self.files():
             try:
@@ -16,6 +16,12 @@ class GameConfiguration(ConfigurationDirectory[Game]):
         self.repository = repository
         self.games: dict[str, Game] = {}
 
+    def load_all(self):
+        """ Loads every game configuration file, then writes all the games at once. """
+        super().load_all()
+        self.repository.upsert_all(self.all)
+        self.repository.session.commit()
+
     def load_data(self, data: dict) -> list[Game]:
         games = []
         for section, attrs in data.items():
@@ -34,7 +40,6 @@ class GameConfiguration(ConfigurationDirectory[Game]):
                 saves_directory=self.get(attrs, section, "saves_directory", str),
                 modding_tools=modding_tools
             )
-            game = self.repository.update(game)
             self.games[section] = game
             games.append(game)
         return games
@@ -0,0 +1,45 @@
+from pathlib import Path
+from tomllib import TOMLDecodeError
+from typing import Any
+import tomllib
+
+from blasmodcli.exceptions.utils import InvalidFieldTypeException
+from blasmodcli.utils import logger
+
+
+class GeneralConfiguration:
+    """ The settings of the application, read from the general configuration file the first time one is needed. """
+
+    def __init__(self, file: Path):
+        self.file = file
+        self.data: dict[str, Any] | None = None
+
+    def load(self) -> dict[str, Any]:
+        if self.data is None:
+            try:
+                with self.file.open("rb") as fd:
+                    self.data = tomllib.load(fd)
+            except FileNotFoundError:
+                self.data = {}
+            except TOMLDecodeError as e:
+                logger.error(f"Could not read '{self.file}', using the default settings instead: {e}")
+                self.data = {}
+        return self.data
+
+    def get(self, section_name: str, field_name: str, expected_type: type, default: Any) -> Any:
+        """
+        Returns the value of a setting, or its default value if it is not set.
+        :param section_name: The name of the section containing the setting.
+        :param field_name: The name of the setting.
+        :param expected_type: The type the value of the setting must have.
+        :param default: The value to use when the setting is not present in the file.
+        :return: The value of the setting.
+        """
+        section = self.load().get(section_name, {})
+        try:
+            value = section[field_name]
+        except KeyError:
+            return default
+        if not isinstance(value, expected_type):
+            raise InvalidFieldTypeException(self.file, section_name, field_name, expected_type, type(value))
+        return value
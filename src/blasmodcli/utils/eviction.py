@@ -0,0 +1,99 @@
+from itertools import groupby
+import time
+
+from blasmodcli.repositories import CachedArchive, FileSystemRepositories
+from blasmodcli.utils.config.general import GeneralConfiguration
+
+SECONDS_PER_DAY = 24 * 60 * 60
+
+ArchiveKey = tuple[str, str, str, str]
+
+
+def archive_key(archive: CachedArchive) -> ArchiveKey:
+    entry = archive.entry
+    return entry.game_id, entry.source_name, entry.mod_name, str(entry.version)
+
+
+class EvictionPolicy:
+    """
+    The limits within which the cache of archives is kept. Each limit is optional, and the archives of the versions
+    that are installed are never evicted, even when they exceed the limits.
+    """
+
+    @classmethod
+    def from_config(cls, config: GeneralConfiguration) -> 'EvictionPolicy':
+        """ Reads the limits from the 'cache' section of the general settings. """
+        max_age = config.get("cache", "max_age", int, None)
+        return cls(
+            config.get("cache", "max_size", int, None),
+            config.get("cache", "keep_versions", int, None),
+            max_age * SECONDS_PER_DAY if max_age is not None else None
+        )
+
+    def __init__(self, max_size: int | None = None, keep_versions: int | None = None, max_age: float | None = None):
+        """
+        :param max_size: The number of bytes the archives can take in total.
+        :param keep_versions: The number of most recent versions of each mod that are kept.
+        :param max_age: The number of seconds after which an archive that was not used is evicted.
+        """
+        self.max_size = max_size
+        self.keep_versions = keep_versions
+        self.max_age = max_age
+
+    @property
+    def is_unlimited(self) -> bool:
+        return self.max_size is None and self.keep_versions is None and self.max_age is None
+
+    def select(self, archives: list[CachedArchive], protected: set[ArchiveKey]) -> list[CachedArchive]:
+        """
+        Chooses the archives to evict. The versions of each mod beyond the most recent ones to keep are evicted first,
+        then the archives that were not used for too long, then the least recently used archives until the cache fits
+        in its size budget.
+        :param archives: Every archive of the cache.
+        :param protected: The archives that must be kept, because their version is installed.
+        :return: The archives to evict, the least recently used first.
+        """
+        candidates = [archive for archive in archives if archive_key(archive) not in protected]
+        evicted: set[int] = set()
+
+        if self.keep_versions is not None:
+            # The installed versions count among the versions that are kept
+            by_mod = sorted(archives, key=lambda archive: archive_key(archive)[:3])
+            for _, versions in groupby(by_mod, key=lambda archive: archive_key(archive)[:3]):
+                newest_first = sorted(versions, key=lambda archive: archive.entry.version, reverse=True)
+                for archive in newest_first[self.keep_versions:]:
+                    if archive_key(archive) not in protected:
+                        evicted.add(id(archive))
+
+        if self.max_age is not None:
+            oldest_access = time.time() - self.max_age
+            evicted.update(id(archive) for archive in candidates if archive.last_access < oldest_access)
+
+        candidates.sort(key=lambda archive: archive.last_access)
+        if self.max_size is not None:
+            size = sum(archive.size for archive in archives if id(archive) not in evicted)
+            for archive in candidates:
+                if size <= self.max_size:
+                    break
+                if id(archive) not in evicted:
+                    evicted.add(id(archive))
+                    size -= archive.size
+
+        return [archive for archive in candidates if id(archive) in evicted]
+
+    def collect(self, fs: FileSystemRepositories, dry_run: bool = False) -> list[CachedArchive]:
+        """
+        Evicts the archives of the cache that exceed the limits, except the ones of the installed versions.
+        :param fs: The repositories of the cache and of the installations.
+        :param dry_run: Whether to only return the archives that would be evicted, without deleting them.
+        :return: The archives that were evicted.
+        """
+        protected = {
+            (game_id, source_name, mod_name, str(version))
+            for (game_id, source_name, mod_name), versions in fs.installations.index().items()
+            for version in versions
+        }
+        evicted = self.select(fs.cache.get_archives(), protected)
+        if not dry_run:
+            fs.cache.evict(evicted)
+        return evicted
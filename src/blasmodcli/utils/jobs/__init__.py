@@ -1,2 +1,3 @@
-from .downloader import Downloader, DownloadJob, download
+from .downloader import DOWNLOAD_CHUNK_SIZE, Downloader, DownloadJob, download
+from .extractor import Extractor, ExtractJob, extract_archive
 from .job import Job, JobList, JobStatus
@@ -1,27 +1,87 @@
-from aiohttp import ClientSession
+from hashlib import sha256
+from http import HTTPStatus
 from pathlib import Path
+from typing import Callable
+import os
+
+from aiohttp import ClientSession, hdrs
 
 from blasmodcli.model import ModVersion
-from blasmodcli.repositories.filesystems.cache import CacheRepository
+from blasmodcli.repositories.filesystems.cache import PARTIAL_SUFFIX, CacheRepository
+from blasmodcli.utils.network import create_session
+from blasmodcli.utils.profiler import profiler
 
 from blasmodcli.utils.jobs.job import Job, JobList
 
 
-DOWNLOAD_CHUNK_SIZE = 1024
+DOWNLOAD_CHUNK_SIZE = 256 * 1024
 DOWNLOAD_JOBS = 8
 
 
-async def download(session: ClientSession, url: str, file: Path, chunk_size: int = DOWNLOAD_CHUNK_SIZE):
-    async with session.get(url) as response:
-        with file.open("wb") as fd:
+def get_partial_file(file: Path) -> Path:
+    return file.with_name(file.name + PARTIAL_SUFFIX)
+
+
+def sync_directory(directory: Path):
+    """ Makes sure that the files renamed in a directory are still renamed after a power loss. """
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+async def download(session: ClientSession, url: str, file: Path, chunk_size: int = DOWNLOAD_CHUNK_SIZE) -> tuple[str, int]:
+    """
+    Downloads a file, which only appears at its destination once it is completely written to the disk.
+    The file is written next to its destination with a '.part' suffix first, and if such a file already exists
+    because a previous download was interrupted, the download resumes where it stopped.
+    :param session: The HTTP session used to make the request.
+    :param url: The URL of the file to download.
+    :param file: The destination of the file.
+    :param chunk_size: The maximum number of bytes read from the network and written to the file at once.
+    :return: The hexadecimal SHA-256 digest of the file and its size, computed while it was written.
+    """
+    partial_file = get_partial_file(file)
+    try:
+        offset = partial_file.stat().st_size
+    except FileNotFoundError:
+        offset = 0
+    headers = {hdrs.RANGE: f"bytes={offset}-"} if offset != 0 else {}
+
+    async with session.get(url, headers=headers) as response:
+        if response.status == HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE:
+            # The partial file is not a part of the current file anymore, starting over
+            partial_file.unlink()
+            return await download(session, url, file, chunk_size)
+        response.raise_for_status()
+
+        # The server may ignore the range and send the whole file instead
+        resumed = response.status == HTTPStatus.PARTIAL_CONTENT
+        digest = sha256()
+        size = 0
+        with partial_file.open("a+b" if resumed else "wb") as fd:
+            if resumed:
+                fd.seek(0)
+                while block := fd.read(chunk_size):
+                    digest.update(block)
+                    size += len(block)
             async for chunk in response.content.iter_chunked(chunk_size):
                 fd.write(chunk)
+                digest.update(chunk)
+                size += len(chunk)
+            fd.flush()
+            os.fsync(fd.fileno())
+
+    os.replace(partial_file, file)
+    sync_directory(file.parent)
+    return digest.hexdigest(), size
 
 
 class DownloadJob(Job):
 
-    def __init__(self, job_list: 'JobList', cache: CacheRepository, mod_version: ModVersion):
-        super().__init__(job_list)
+    def __init__(self, job_list: 'Downloader', cache: CacheRepository, mod_version: ModVersion, priority: int = 0):
+        super().__init__(job_list, priority)
         self.cache = cache
         self.mod_version = mod_version
 
@@ -34,17 +94,49 @@ class DownloadJob(Job):
         return self.mod_version.get_download_url()
 
     async def internal_run(self):
-        async with ClientSession() as session:
-            await download(session, self.download_url, self.archive)
+        with profiler.span("Downloading archive", "network", mod=str(self.mod_version)):
+            digest, size = await download(self.list.session, self.download_url, self.archive, self.list.chunk_size)
+        self.cache.record(self.mod_version, digest, size)
+        if self.list.on_downloaded is not None:
+            self.list.on_downloaded(self)
 
 
 class Downloader(JobList):
-
-    def __init__(self, mod_versions: list[ModVersion], cache: CacheRepository, jobs: int = DOWNLOAD_JOBS):
-        super().__init__(jobs, len(mod_versions))
+    """
+    Downloads the archives of mods to the cache.
+    The archives expected to be the largest are downloaded first, so that they do not end up being the only ones left
+    downloading. The other archives are downloaded in the order they were given, which puts dependencies first.
+    """
+
+    def __init__(
+            self,
+            mod_versions: list[ModVersion],
+            cache: CacheRepository,
+            jobs: int = DOWNLOAD_JOBS,
+            chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+            on_downloaded: Callable[[DownloadJob], None] | None = None
+    ):
+        """
+        :param mod_versions: The mods and versions of the archives to download, in order.
+        :param cache: The cache in which the archives are written.
+        :param jobs: The number of archives downloaded at the same time.
+        :param chunk_size: The maximum number of bytes read from the network and written to the file at once.
+        :param on_downloaded: Called as soon as an archive is downloaded, while the others are still downloading.
+        """
+        super().__init__(jobs)
         self.mod_versions = mod_versions
         self.cache = cache
-
-    def get_next_job(self) -> 'Job':
-        index = self.completed_jobs + self.running_jobs
-        return DownloadJob(self, self.cache, self.mod_versions[index])
+        self.chunk_size = chunk_size
+        self.on_downloaded = on_downloaded
+        self.session: ClientSession | None = None
+
+    async def run(self):
+        async with create_session(limit_per_host=self.concurrent_jobs) as self.session:
+            await super().run()
+
+    def get_jobs(self) -> list['Job']:
+        jobs = []
+        for mod_version in self.mod_versions:
+            size = self.cache.get_size_hint(mod_version.mod)
+            jobs.append(DownloadJob(self, self.cache, mod_version, -size if size is not None else 0))
+        return jobs
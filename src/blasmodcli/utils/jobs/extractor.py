@@ -0,0 +1,254 @@
+from asyncio import get_running_loop
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from pathlib import Path, PurePosixPath
+from zipfile import BadZipFile, ZipFile, ZipInfo
+import hashlib
+import os
+import zlib
+
+from blasmodcli.model import File, Installation
+from blasmodcli.model.file import FILE_HASH_ALGORITHM
+from blasmodcli.repositories.filesystems.store import Store
+from blasmodcli.utils.jobs.job import Job, JobList
+from blasmodcli.utils.profiler import profiler
+
+EXTRACTION_CHUNK_SIZE = 256 * 1024
+EXTRACTION_JOBS = os.cpu_count() or 4
+
+
+def get_member_path(destination: Path, info: ZipInfo) -> Path:
+    relpath = PurePosixPath(info.filename)
+    if relpath.is_absolute() or ".." in relpath.parts:
+        raise BadZipFile(f"The archive contains a file outside of its destination: '{info.filename}'.")
+    return destination / relpath
+
+
+def get_size(path: Path) -> int | None:
+    try:
+        return path.stat().st_size
+    except FileNotFoundError:
+        return None
+
+
+def get_identical_hash(path: Path, info: ZipInfo, chunk_size: int = EXTRACTION_CHUNK_SIZE) -> str | None:
+    """
+    Compares a file with a member of an archive, using the CRC stored in the archive.
+    The file is read once, to compute both its CRC and its hash.
+    :return: The hexadecimal digest of the file if it is identical to the member, None otherwise.
+    """
+    if get_size(path) != info.file_size:
+        return None
+    crc = 0
+    digest = hashlib.new(FILE_HASH_ALGORITHM)
+    with path.open("rb") as fd:
+        while chunk := fd.read(chunk_size):
+            crc = zlib.crc32(chunk, crc)
+            digest.update(chunk)
+    return digest.hexdigest() if crc == info.CRC else None
+
+
+def extract_member(zipfile: ZipFile, info: ZipInfo, path: Path, chunk_size: int = EXTRACTION_CHUNK_SIZE) -> str:
+    """
+    Extracts a file from an archive, hashing its content while it is written.
+    The file is synchronized to the disk, so that it can be safely renamed afterward.
+    :return: The hexadecimal digest of the extracted file.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    digest = hashlib.new(FILE_HASH_ALGORITHM)
+    with zipfile.open(info) as source, path.open("wb") as destination:
+        while chunk := source.read(chunk_size):
+            destination.write(chunk)
+            digest.update(chunk)
+        destination.flush()
+        os.fsync(destination.fileno())
+    return digest.hexdigest()
+
+
+def get_members(archive: Path) -> dict[str, tuple[int, int]]:
+    """ Returns the CRC and size of the members of an archive, only reading its central directory. """
+    with ZipFile(archive, "r") as zipfile:
+        return {info.filename: (info.CRC, info.file_size) for info in zipfile.infolist()}
+
+
+def extract_archive(
+        archive: Path,
+        destination: Path,
+        staging: Path,
+        known_hashes: dict[str, str],
+        previous_archive: Path | None = None,
+        chunk_size: int = EXTRACTION_CHUNK_SIZE
+) -> dict[str, str]:
+    """
+    Extracts the files of an archive to a staging directory, except the ones that are already identical in the
+    destination directory.
+    Members that have the same CRC and size in the previous archive are considered identical as long as the file
+    extracted from the previous archive still has the same size, without reading it. The other files that already
+    exist are read to be compared with their member, but are only written if they differ.
+    :param archive: The ZIP archive to extract.
+    :param destination: The directory in which the files will be installed.
+    :param staging: The directory in which the files that differ are extracted.
+    :param known_hashes: The hashes the files had when they were previously extracted, by relative path.
+    :param previous_archive: The archive the files were previously extracted from, if it still exists.
+    :param chunk_size: The maximum number of bytes decompressed and written at once.
+    :return: The hash of every file of the archive, by relative path.
+    """
+    previous_members = get_members(previous_archive) if previous_archive is not None else {}
+    hashes = {}
+    with ZipFile(archive, "r") as zipfile:
+        for info in zipfile.infolist():
+            path = get_member_path(destination, info)
+            if info.is_dir():
+                path.mkdir(parents=True, exist_ok=True)
+                continue
+
+            known_hash = known_hashes.get(info.filename)
+            unchanged = previous_members.get(info.filename) == (info.CRC, info.file_size)
+            if known_hash is not None and unchanged and get_size(path) == info.file_size:
+                hashes[info.filename] = known_hash
+                continue
+
+            identical_hash = get_identical_hash(path, info, chunk_size)
+            if identical_hash is not None:
+                hashes[info.filename] = identical_hash
+            else:
+                hashes[info.filename] = extract_member(zipfile, info, get_member_path(staging, info), chunk_size)
+    return hashes
+
+
+def unpack_archive(
+        archive: Path,
+        archive_digest: str,
+        store: Store,
+        destination: Path,
+        staging: Path,
+        chunk_size: int = EXTRACTION_CHUNK_SIZE
+) -> dict[str, str]:
+    """
+    Links the files of an archive from the store to a staging directory, except the ones that are already linked in
+    the destination directory. The archive is only decompressed into the store if it was not added to it before.
+    :param archive: The ZIP archive to unpack.
+    :param archive_digest: The digest of the archive, as recorded when it was downloaded.
+    :param store: The store keeping the extracted files by hash.
+    :param destination: The directory in which the files will be installed.
+    :param staging: The directory in which the files that differ are linked.
+    :param chunk_size: The maximum number of bytes decompressed and written at once.
+    :return: The hash of every file of the archive, by relative path.
+    """
+    hashes = store.get_members(archive_digest)
+    if hashes is None:
+        hashes = {}
+        with ZipFile(archive, "r") as zipfile:
+            for info in zipfile.infolist():
+                path = get_member_path(destination, info)
+                if info.is_dir():
+                    path.mkdir(parents=True, exist_ok=True)
+                    continue
+                with zipfile.open(info) as source:
+                    hashes[info.filename] = store.add(source, chunk_size)
+        store.set_members(archive_digest, hashes)
+
+    for relpath, digest in hashes.items():
+        path = destination / relpath
+        if not store.is_linked(digest, path):
+            store.link(digest, staging / relpath)
+    return hashes
+
+
+class ExtractJob(Job):
+
+    def __init__(
+            self,
+            job_list: 'Extractor',
+            installation: Installation,
+            archive: Path,
+            staging: Path,
+            previous_installation: Installation | None = None,
+            previous_archive: Path | None = None,
+            archive_digest: str | None = None
+    ):
+        super().__init__(job_list)
+        self.installation = installation
+        self.archive = archive
+        self.staging = staging
+        self.previous_installation = previous_installation if previous_installation is not None else installation
+        self.previous_archive = previous_archive
+        self.archive_digest = archive_digest
+        self.deleted_files: set[str] = set()
+        # Resolved on the event loop, as the extraction thread must not use the database session
+        self.destination = installation.mod.game.modding_directory
+        previous_files = self.previous_installation.files
+        self.previous_relpaths = {file.relpath for file in previous_files}
+        self.known_hashes = {file.relpath: file.hash_digest for file in previous_files if file.hash_digest is not None}
+
+    def extract(self):
+        """
+        Stages the files of the archive that differ from the files of the previous installation, and finds the files
+        of the previous installation that are not part of the archive anymore.
+        """
+        with profiler.span("Extracting archive", "extraction", archive=str(self.archive)):
+            if self.list.store is not None and self.archive_digest is not None:
+                hashes = unpack_archive(
+                    self.archive, self.archive_digest, self.list.store, self.destination, self.staging, self.list.chunk_size
+                )
+            else:
+                hashes = extract_archive(
+                    self.archive,
+                    self.destination,
+                    self.staging,
+                    self.known_hashes,
+                    self.previous_archive,
+                    self.list.chunk_size
+                )
+        self.deleted_files = self.previous_relpaths - hashes.keys()
+        self.installation.files = [File(self.installation, relpath, digest) for relpath, digest in hashes.items()]
+
+    async def internal_run(self):
+        # The context is copied so that the spans of the extraction are nested in the span of the command
+        await get_running_loop().run_in_executor(self.list.executor, copy_context().run, self.extract)
+
+
+class Extractor(JobList):
+    """
+    Extracts the archives of mods into the modding directory of their game, with a pool of threads.
+    Decompressing, hashing and writing files does not hold the global interpreter lock, so archives are really
+    extracted in parallel. With a store, the archives whose digest is known are unpacked through the store instead.
+    """
+
+    def __init__(
+            self,
+            jobs: int = EXTRACTION_JOBS,
+            chunk_size: int = EXTRACTION_CHUNK_SIZE,
+            store: Store | None = None
+    ):
+        super().__init__(jobs)
+        self.chunk_size = chunk_size
+        self.store = store
+        self.executor: ThreadPoolExecutor | None = None
+
+    def add(
+            self,
+            installation: Installation,
+            archive: Path,
+            staging: Path,
+            previous_installation: Installation | None = None,
+            previous_archive: Path | None = None,
+            archive_digest: str | None = None
+    ) -> ExtractJob:
+        """
+        Queues the extraction of an archive.
+        :param installation: The installation the extracted files are recorded into.
+        :param archive: The archive to extract.
+        :param staging: The directory in which the files are extracted before being installed.
+        :param previous_installation: The installation being replaced, by default the installation itself.
+        :param previous_archive: The archive of the installation being replaced, if it is still in the cache.
+        :param archive_digest: The digest of the archive, needed to unpack it through the store.
+        :return: The job extracting the archive.
+        """
+        job = ExtractJob(self, installation, archive, staging, previous_installation, previous_archive, archive_digest)
+        self.add_job(job)
+        return job
+
+    async def run(self):
+        with ThreadPoolExecutor(self.concurrent_jobs) as self.executor:
+            await super().run()
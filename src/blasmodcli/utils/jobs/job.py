@@ -1,24 +1,40 @@
 from abc import ABC, abstractmethod
-from asyncio import TaskGroup
+from asyncio import CancelledError, Event, PriorityQueue, Task, TaskGroup, create_task, current_task
 from enum import IntEnum
+from itertools import count
 
 
 class JobStatus(IntEnum):
     PENDING = 0
     RUNNING = 1
     COMPLETED = 2
+    FAILED = 3
+    CANCELLED = 4
 
 
 class Job(ABC):
+    """
+    A task run by a job list once one of its workers is available.
+    Jobs with the lowest priority values are run first, and jobs with the same priority in the order they were added.
+    """
 
-    def __init__(self, job_list: 'JobList'):
+    def __init__(self, job_list: 'JobList', priority: int = 0):
         self.list = job_list
+        self.priority = priority
         self.status = JobStatus.PENDING
+        self.error: Exception | None = None
+        self.task: Task | None = None
 
-    def complete(self):
-        self.status = JobStatus.COMPLETED
-        self.list.running_jobs -= 1
-        self.list.completed_jobs += 1
+    @property
+    def is_done(self) -> bool:
+        return self.status >= JobStatus.COMPLETED
+
+    def cancel(self):
+        """ Prevents the job from running if it is pending, or interrupts it if it is running. """
+        if self.status == JobStatus.PENDING:
+            self.status = JobStatus.CANCELLED
+        elif self.status == JobStatus.RUNNING and self.task is not None:
+            self.task.cancel()
 
     @abstractmethod
     async def internal_run(self):
@@ -26,36 +42,105 @@ class Job(ABC):
 
     async def run(self):
         self.status = JobStatus.RUNNING
-        await self.internal_run()
-        self.complete()
+        try:
+            await self.internal_run()
+        except CancelledError:
+            self.status = JobStatus.CANCELLED
+            raise
+        except Exception as e:
+            self.status = JobStatus.FAILED
+            self.error = e
+        else:
+            self.status = JobStatus.COMPLETED
 
 
 class JobList(ABC):
+    """
+    Runs jobs with a fixed number of workers, that wait for jobs to be queued instead of polling for them.
+    The failure of a job does not stop the others, its error is kept in the job instead.
+    An open list keeps running when it has no job left, until it is closed, so that it can be fed by another list.
+    """
 
-    def __init__(self, concurrent_jobs: int, total_jobs: int):
+    def __init__(self, concurrent_jobs: int):
         self.jobs: list['Job'] = []
         self.concurrent_jobs = concurrent_jobs
-        self.running_jobs = 0
-        self.completed_jobs = 0
-        self.total_jobs = total_jobs
-        self.task_group = TaskGroup()
+        self.queue: PriorityQueue[tuple[int, int, 'Job']] = PriorityQueue()
+        self.order = count()
+        self.closed = Event()
+        self.closed.set()
 
     @property
-    def jobs_left(self) -> int:
-        return self.total_jobs - (self.completed_jobs + self.running_jobs)
+    def completed_jobs(self) -> int:
+        return self.count(JobStatus.COMPLETED)
+
+    @property
+    def running_jobs(self) -> int:
+        return self.count(JobStatus.RUNNING)
+
+    @property
+    def failed_jobs(self) -> list['Job']:
+        return [job for job in self.jobs if job.status == JobStatus.FAILED]
+
+    @property
+    def total_jobs(self) -> int:
+        return len(self.jobs)
+
+    def count(self, status: JobStatus) -> int:
+        return sum(1 for job in self.jobs if job.status == status)
 
     def add_job(self, job: 'Job'):
+        """ Queues a job, which can be done before or while the list is running. """
         self.jobs.append(job)
-        self.running_jobs += 1
-        self.task_group.create_task(job.run())
+        self.queue.put_nowait((job.priority, next(self.order), job))
+
+    def cancel(self):
+        for job in self.jobs:
+            job.cancel()
+
+    def open(self):
+        """ Keeps the list running once its queue is empty, as more jobs are going to be added while it runs. """
+        self.closed.clear()
+
+    def close(self):
+        """ Lets the list stop once the jobs that were added are done. """
+        self.closed.set()
 
     async def run(self):
-        async with self.task_group:
-            while self.jobs_left != 0:
-                if self.running_jobs != self.concurrent_jobs:
-                    job = self.get_next_job()
-                    self.add_job(job)
+        for job in self.get_jobs():
+            self.add_job(job)
 
-    @abstractmethod
-    def get_next_job(self) -> 'Job':
-        pass
+        if self.closed.is_set():
+            number_of_workers = min(self.concurrent_jobs, self.queue.qsize())
+        else:
+            number_of_workers = self.concurrent_jobs
+        if number_of_workers == 0:
+            return
+        async with TaskGroup() as task_group:
+            workers = [task_group.create_task(self.work()) for _ in range(number_of_workers)]
+            await self.closed.wait()
+            await self.queue.join()
+            # Every job is done, the workers are only waiting for the next one
+            for worker in workers:
+                worker.cancel()
+
+    async def work(self):
+        while True:
+            _, _, job = await self.queue.get()
+            try:
+                if job.status == JobStatus.PENDING:
+                    await self.run_job(job)
+            finally:
+                self.queue.task_done()
+
+    async def run_job(self, job: 'Job'):
+        job.task = create_task(job.run())
+        try:
+            await job.task
+        except CancelledError:
+            # Only the job was cancelled, the worker moves on to the next one
+            if current_task().cancelling() != 0:
+                raise
+
+    def get_jobs(self) -> list['Job']:
+        """ Returns the jobs queued when the list starts running, in addition to the ones added beforehand. """
+        return []
@@ -0,0 +1,3 @@
+from .ratelimit import RateLimiter, check_rate_limit
+from .session import create_session
+from .validation import get_conditional_headers, update_validator
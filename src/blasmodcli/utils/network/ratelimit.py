@@ -0,0 +1,117 @@
+from asyncio import Semaphore, get_running_loop, sleep
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from http import HTTPStatus
+from itertools import count
+from time import time
+from typing import TypeVar
+
+from aiohttp import ClientConnectionError, ClientResponse, ClientResponseError, hdrs
+
+from blasmodcli.exceptions.utils import RateLimitException
+from blasmodcli.utils import logger
+
+BACKOFF_BASE_DELAY = 1.0
+BACKOFF_MAX_DELAY = 60.0
+MAX_CONCURRENT_REQUESTS = 8
+MAX_RETRIES = 5
+MAX_WAITING_DELAY = 300.0
+
+RATE_LIMIT_REMAINING_HEADER = "X-RateLimit-Remaining"
+RATE_LIMIT_RESET_HEADER = "X-RateLimit-Reset"
+
+T = TypeVar("T")
+
+
+def get_retry_after(response: ClientResponse) -> float | None:
+    retry_after = response.headers.get(hdrs.RETRY_AFTER)
+    if retry_after is None:
+        return None
+    if retry_after.isdigit():
+        return float(retry_after)
+    try:
+        return (parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)).total_seconds()
+    except (TypeError, ValueError):
+        return None
+
+
+def get_rate_limit_reset(response: ClientResponse) -> float | None:
+    if response.headers.get(RATE_LIMIT_REMAINING_HEADER) != "0":
+        return None
+    reset = response.headers.get(RATE_LIMIT_RESET_HEADER)
+    if reset is None or not reset.isdigit():
+        return None
+    return int(reset) - time()
+
+
+def check_rate_limit(response: ClientResponse):
+    """
+    Raises an exception if the server refused to answer because too many requests were made.
+    GitHub answers with a '403 Forbidden' instead of a '429 Too Many Requests' when a rate limit is exceeded,
+    in which case only the headers tell the difference with a genuine '403 Forbidden'.
+    :param response: The response received from the server.
+    :raises RateLimitException: If the request must be made again later, with the delay to wait if the server gave one.
+    """
+    if response.status not in (HTTPStatus.TOO_MANY_REQUESTS, HTTPStatus.FORBIDDEN):
+        return
+
+    delay = get_retry_after(response)
+    if delay is None:
+        delay = get_rate_limit_reset(response)
+    if delay is None and response.status == HTTPStatus.FORBIDDEN:
+        return
+    raise RateLimitException(str(response.url), max(0.0, delay) if delay is not None else None)
+
+
+def get_backoff_delay(attempt: int) -> float:
+    return min(BACKOFF_MAX_DELAY, BACKOFF_BASE_DELAY * 2 ** attempt)
+
+
+class RateLimiter:
+    """
+    Bounds the number of simultaneous requests, and retries the ones that failed because of rate limits or temporary
+    errors. When a server asks to slow down, every request waits, not only the one that was refused.
+    """
+
+    def __init__(self, max_concurrent_requests: int = MAX_CONCURRENT_REQUESTS, max_retries: int = MAX_RETRIES):
+        self.semaphore = Semaphore(max_concurrent_requests)
+        self.max_concurrent_requests = max_concurrent_requests
+        self.max_retries = max_retries
+        self.resume_time = 0.0
+
+    def postpone(self, delay: float):
+        self.resume_time = max(self.resume_time, get_running_loop().time() + delay)
+
+    async def wait(self):
+        loop = get_running_loop()
+        while (delay := self.resume_time - loop.time()) > 0:
+            await sleep(delay)
+
+    async def run(self, request: Callable[[], Awaitable[T]]) -> T:
+        """
+        Makes a request once a slot is available and the servers are not asking to wait anymore.
+        :param request: A function creating the coroutine that makes the request, called once per attempt.
+        :return: The result of the request.
+        """
+        for attempt in count():
+            async with self.semaphore:
+                await self.wait()
+                try:
+                    return await request()
+                except RateLimitException as e:
+                    delay = e.delay if e.delay is not None else get_backoff_delay(attempt)
+                    if attempt >= self.max_retries or delay > MAX_WAITING_DELAY:
+                        raise
+                    logger.info(f"{e} Waiting {delay:.1f} seconds before retrying.")
+                    self.postpone(delay)
+                    continue
+                except ClientResponseError as e:
+                    if e.status < HTTPStatus.INTERNAL_SERVER_ERROR or attempt >= self.max_retries:
+                        raise
+                    logger.info(f"Server error {e.status} for '{e.request_info.url}', retrying.")
+                except (ClientConnectionError, TimeoutError) as e:
+                    if attempt >= self.max_retries:
+                        raise
+                    logger.info(f"{e.__class__.__name__}: {e}, retrying.")
+            await sleep(get_backoff_delay(attempt))
@@ -0,0 +1,50 @@
+from types import SimpleNamespace
+
+from aiohttp import ClientSession, TCPConnector, TraceConfig, TraceRequestEndParams, TraceRequestExceptionParams, TraceRequestStartParams
+
+from blasmodcli.utils.profiler import profiler
+
+CONNECTIONS_LIMIT = 64
+CONNECTIONS_PER_HOST = 16
+DNS_CACHE_TTL = 300
+KEEPALIVE_TIMEOUT = 30
+
+
+def create_trace_config() -> TraceConfig:
+    """ Records every request as a span of the profiler, from the moment it is sent until its headers are received. """
+    async def on_request_start(_: ClientSession, context: SimpleNamespace, params: TraceRequestStartParams):
+        context.span = profiler.span("HTTP request", "network", method=params.method, url=str(params.url))
+        context.span.begin()
+
+    async def on_request_end(_: ClientSession, context: SimpleNamespace, params: TraceRequestEndParams):
+        context.span.args["status"] = params.response.status
+        context.span.finish()
+
+    async def on_request_exception(_: ClientSession, context: SimpleNamespace, params: TraceRequestExceptionParams):
+        context.span.args["exception"] = repr(params.exception)
+        context.span.finish()
+
+    trace_config = TraceConfig()
+    trace_config.on_request_start.append(on_request_start)
+    trace_config.on_request_end.append(on_request_end)
+    trace_config.on_request_exception.append(on_request_exception)
+    return trace_config
+
+
+def create_session(limit_per_host: int = CONNECTIONS_PER_HOST) -> ClientSession:
+    """
+    Creates an HTTP session whose connections are pooled and kept alive between requests.
+    A single session should be shared by every request of a command, so that the TCP and TLS handshakes with a host
+    are only paid once per connection instead of once per request.
+    Must be called from within a running event loop.
+    :param limit_per_host: The maximum number of simultaneous connections opened to the same host.
+    :return: A new session, to be used as an asynchronous context manager.
+    """
+    connector = TCPConnector(
+        limit=CONNECTIONS_LIMIT,
+        limit_per_host=limit_per_host,
+        keepalive_timeout=KEEPALIVE_TIMEOUT,
+        ttl_dns_cache=DNS_CACHE_TTL
+    )
+    trace_configs = [create_trace_config()] if profiler.enabled else []
+    return ClientSession(connector=connector, trace_configs=trace_configs)
@@ -0,0 +1,25 @@
+from aiohttp import ClientResponse, hdrs
+
+from blasmodcli.model import ResponseValidator
+
+
+def get_conditional_headers(validator: ResponseValidator) -> dict[str, str]:
+    """
+    Returns the headers that make a request conditional, so that the server answers with a bodiless
+    '304 Not Modified' if the resource did not change since the last time it was received.
+    :param validator: The validators stored from the previous response.
+    :return: The conditional request headers, empty if nothing was stored.
+    """
+    headers = {}
+    if validator.etag is not None:
+        headers[hdrs.IF_NONE_MATCH] = validator.etag
+    if validator.last_modified is not None:
+        headers[hdrs.IF_MODIFIED_SINCE] = validator.last_modified
+    return headers
+
+
+def update_validator(validator: ResponseValidator, response: ClientResponse, location: str | None = None):
+    validator.etag = response.headers.get(hdrs.ETAG, validator.etag)
+    validator.last_modified = response.headers.get(hdrs.LAST_MODIFIED, validator.last_modified)
+    if location is not None:
+        validator.location = location
@@ -1,3 +1,3 @@
 from .meta_parser import MetaModListParser
 from .official_parser import OfficialModListParser
-from .parser import ModListParser
+from .parser import ModListParser, hash_entry
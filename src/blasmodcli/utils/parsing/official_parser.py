@@ -1,23 +1,70 @@
-import json
 from datetime import datetime
+from http import HTTPStatus
 
-from aiohttp import ClientSession
-from typing import Generator
+from aiohttp import ClientResponse, ClientSession, hdrs
+from typing import AsyncGenerator, Generator
+from yarl import URL
 
 from blasmodcli.exceptions.utils import NameConversionError
-from blasmodcli.model import Authorship, Mod, Source, Version
+from blasmodcli.model import Authorship, Mod, ResponseValidator, Source, Version
+from blasmodcli.repositories import ValidatorRepository
+from blasmodcli.utils.network import RateLimiter, check_rate_limit, get_conditional_headers, update_validator
 from blasmodcli.utils.parsing.parser import ModListParser, Object
+from blasmodcli.utils.parsing.stream import iter_json_array
 from blasmodcli.view import DateFormat
 
 AUTHORS_SEPARATOR = " && "
+LATEST_RELEASE_PATH = "/releases/latest"
+MAX_REDIRECTS = 5
+REDIRECTION_STATUSES = (
+    HTTPStatus.MOVED_PERMANENTLY,
+    HTTPStatus.FOUND,
+    HTTPStatus.SEE_OTHER,
+    HTTPStatus.TEMPORARY_REDIRECT,
+    HTTPStatus.PERMANENT_REDIRECT
+)
+
+
+async def fetch_latest_version(
+        session: ClientSession,
+        repository: str,
+        validator: ResponseValidator,
+        max_redirects: int = MAX_REDIRECTS
+) -> Version:
+    """
+    Resolves the latest release of a GitHub repository.
+    The redirection to the release's page is not followed, its location is enough to know the tag of the release,
+    which saves downloading the page itself. The location is stored in the validator and reused when the server
+    answers that nothing changed.
+    :param session: The HTTP session used to make the request.
+    :param repository: The URL of the repository.
+    :param validator: The validators of the previous request made to this repository.
+    :param max_redirects: The maximum number of moved repositories followed before giving up.
+    :return: The version of the latest release.
+    """
+    url = f"{repository}{LATEST_RELEASE_PATH}"
+    headers = get_conditional_headers(validator) if validator.location is not None else {}
+    for _ in range(max_redirects + 1):
+        async with session.get(url, headers=headers, allow_redirects=False) as response:
+            check_rate_limit(response)
+            if response.status == HTTPStatus.NOT_MODIFIED:
+                location = validator.location
+            elif response.status in REDIRECTION_STATUSES:
+                location = str(response.url.join(URL(response.headers[hdrs.LOCATION])))
+            else:
+                response.raise_for_status()
+                location = str(response.url)
+            if validator is not None:
+                update_validator(validator, response, location)
 
-
-async def fetch_latest_version(session: ClientSession, repository: str) -> Version:
-    url = f"{repository}/releases/latest"
-    async with session.get(url) as response:
-        response.raise_for_status()
-        version_string = response.url.parts[-1]
-        return Version.from_tag(version_string)
+        if not location.endswith(LATEST_RELEASE_PATH):
+            return Version.from_tag(URL(location).parts[-1])
+        # The repository was moved or renamed, and the redirection points to the latest release of the new repository,
+        # whose request is not conditional since the validators only belong to the first one
+        url = location
+        headers = {}
+        validator = None
+    raise ValueError(f"Too many redirections while resolving the latest release of {repository}.")
 
 
 def parse_authors(string: str) -> Generator[str]:
@@ -45,31 +92,50 @@ def convert_to_name(display_name: str) -> str:
 class OfficialModListParser(ModListParser):
     __parser_name__ = "official"
 
-    def __init__(self, source: Source):
-        super().__init__(source)
-        self.all_data: list[Object] = []
-
-    async def fetch(self):
-        async with ClientSession() as session:
-            async with session.get(self.source.url) as response:
-                response.raise_for_status()
-                content = await response.content.read()
-        data = json.loads(content)
-        if not isinstance(data, list):
-            raise TypeError(f"The JSON file's contents should be a list of objects, got '{type(self.all_data)}' instead.")
-        self.all_data = data
-        self.total = len(self.all_data)
-
-    def data(self) -> Generator[Object]:
-        for i, data in enumerate(self.all_data):
-            if not isinstance(data, dict):
-                raise TypeError(f"The value at index {i} is of type {type(data)} and not an object.")
-            yield data
+    def __init__(self, source: Source, session: ClientSession, validators: ValidatorRepository, limiter: RateLimiter):
+        super().__init__(source, session, validators, limiter)
+        self.response: ClientResponse | None = None
+
+    async def fetch(self, revalidate: bool = True) -> bool:
+        validator = self.validators.get(self.source.url)
+        headers = get_conditional_headers(validator) if revalidate else {}
+        response = await self.session.get(self.source.url, headers=headers)
+        try:
+            check_rate_limit(response)
+            if response.status == HTTPStatus.NOT_MODIFIED:
+                response.release()
+                return False
+            response.raise_for_status()
+        except BaseException:
+            response.release()
+            raise
+        self.response = response
+        return True
+
+    async def fetch_latest_version(self, repository: str) -> Version:
+        validator = self.validators.get(f"{repository}{LATEST_RELEASE_PATH}")
+        return await self.limiter.run(lambda: fetch_latest_version(self.session, repository, validator))
+
+    async def data(self) -> AsyncGenerator[Object]:
+        """
+        Yields the entries of the list as soon as they are received, without keeping the whole list in memory.
+        The validators of the list are only updated once it was entirely read, so that a list that could not be read
+        is fetched again by the next update.
+        """
+        try:
+            i = 0
+            async for data in iter_json_array(self.response.content.iter_any()):
+                if not isinstance(data, dict):
+                    raise ValueError(f"The value at index {i} is of type {type(data)} and not an object.")
+                yield data
+                i += 1
+            update_validator(self.validators.get(self.source.url), self.response)
+        finally:
+            self.response.release()
 
     async def parse_internal(self, data: Object) -> Mod:
         repository = f"https://github.com/{data['GithubAuthor']}/{data['GithubRepo']}"
-        async with ClientSession() as session:
-            latest_version = await fetch_latest_version(session, repository)
+        latest_version = await self.fetch_latest_version(repository)
         display_name = data["Name"]
         name = convert_to_name(display_name)
         plugin_file_name = data["PluginFile"]
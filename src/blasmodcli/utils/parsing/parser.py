@@ -1,35 +1,64 @@
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Generator
+from hashlib import sha256
+from typing import Any, AsyncGenerator, Dict
+import json
 
-from blasmodcli.model import Mod, Source, Dependency
+from aiohttp import ClientSession
+
+from blasmodcli.model import Mod, Source, Version
+from blasmodcli.repositories import ValidatorRepository
+from blasmodcli.utils import logger
+from blasmodcli.utils.network import RateLimiter
 from blasmodcli.utils.parsing.meta_parser import MetaModListParser
 
 Object = Dict[str, Any]
 
 
+def hash_entry(data: Object) -> str:
+    """
+    Returns a digest of an entry of a mod list, that does not depend on the order of its keys.
+    :param data: The raw entry, as found in the mod list.
+    :return: The hexadecimal SHA-256 digest of the entry.
+    """
+    serialized = json.dumps(data, sort_keys=True, separators=(",", ":"))
+    return sha256(serialized.encode()).hexdigest()
+
+
 class ModListParser(ABC, metaclass=MetaModListParser):
 
-    def __init__(self, source: Source):
+    def __init__(self, source: Source, session: ClientSession, validators: ValidatorRepository, limiter: RateLimiter):
         self.source = source
+        self.session = session
+        self.validators = validators
+        self.limiter = limiter
         self.mods: dict[str, Mod] = {}
         self.dependencies: dict[str, list[str]] = {}
-        self.done = 0
-        self.total = 0
 
-    def extend(self, mods: list[Mod]):
-        for mod in self.mods.values():
-            mods.append(mod)
+    def keep(self, mod: Mod):
+        """ Registers a mod whose entry did not change since the last update, without parsing it again. """
+        self.mods[mod.name] = mod
+
+    @abstractmethod
+    def data(self) -> AsyncGenerator[Object]:
+        """ Yields the entries of the list of mods that was fetched, while it is being received. """
+        pass
 
     @abstractmethod
-    def data(self) -> Generator[Object]:
+    async def fetch(self, revalidate: bool = True) -> bool:
+        """
+        Requests the list of mods of the source, whose entries are then read with the data method.
+        :param revalidate: Whether to make a conditional request using the validators of the previous update.
+        :return: False if the list did not change since the previous update and was therefore not fetched.
+        """
         pass
 
     @abstractmethod
-    async def fetch(self):
+    async def fetch_latest_version(self, repository: str) -> Version:
         pass
 
-    async def parse(self, data: Object) -> Mod:
+    async def parse(self, data: Object, content_hash: str) -> Mod:
         mod = await self.parse_internal(data)
+        mod.content_hash = content_hash
         self.mods[mod.name] = mod
         return mod
 
@@ -37,9 +66,17 @@ class ModListParser(ABC, metaclass=MetaModListParser):
     async def parse_internal(self, data: Object) -> Mod:
         pass
 
-    def resolve_dependencies(self):
+    def resolve_dependencies(self) -> list[tuple[Mod, Mod]]:
+        """
+        Finds the mods that each parsed mod depends on, among the mods of the same source.
+        :return: The pairs of a mod and one of its dependencies.
+        """
+        dependencies = []
         for mod_name, mod_dependencies in self.dependencies.items():
             mod = self.mods[mod_name]
             for dependency_name in mod_dependencies:
-                dependency = self.mods[dependency_name]
-                mod.dependencies.append(Dependency(dependency=dependency))
+                if dependency_name not in self.mods:
+                    logger.warning(f"The mod '{mod_name}' depends on the unknown mod '{dependency_name}', ignoring it.")
+                    continue
+                dependencies.append((mod, self.mods[dependency_name]))
+        return dependencies
@@ -0,0 +1,107 @@
+from codecs import getincrementaldecoder
+from json import JSONDecodeError, JSONDecoder
+from typing import Any, AsyncGenerator, AsyncIterable
+
+WHITESPACE = " \t\n\r"
+
+decoder = JSONDecoder()
+
+
+def skip_whitespace(buffer: str, index: int) -> int:
+    while index < len(buffer) and buffer[index] in WHITESPACE:
+        index += 1
+    return index
+
+
+async def iter_json_array(chunks: AsyncIterable[bytes]) -> AsyncGenerator[Any]:
+    """
+    Parses a JSON array as its bytes arrive, yielding each of its values as soon as it is complete.
+    Only the part of the document that was not parsed yet is kept in memory, so parsing a large array does not require
+    keeping the whole document.
+    :param chunks: The bytes of a UTF-8 encoded JSON document, whose top-level value is an array.
+    :raises ValueError: If the top-level value is not an array.
+    :raises JSONDecodeError: If the document is not valid JSON, including when anything follows the array.
+
+    >>> import asyncio
+    >>> async def parse(*chunks):
+    ...     async def iterate():
+    ...         for chunk in chunks:
+    ...             yield chunk
+    ...     return [value async for value in iter_json_array(iterate())]
+    >>> asyncio.run(parse(b'[{"a": 1', b'2}, 3', b'4, "te', b'xt"] ', b'\\n'))
+    [{'a': 12}, 34, 'text']
+    >>> asyncio.run(parse(b'[1]garbage'))
+    Traceback (most recent call last):
+    ...
+    json.decoder.JSONDecodeError: Extra data: line 1 column 4 (char 3)
+    >>> asyncio.run(parse(b'[1]', b' garbage'))
+    Traceback (most recent call last):
+    ...
+    json.decoder.JSONDecodeError: Extra data: line 1 column 2 (char 1)
+    """
+    utf8 = getincrementaldecoder("utf-8")()
+    buffer = ""
+    index = 0
+    started = False
+    expect_value = True
+    values = 0
+    closed = False
+    finished = False
+    iterator = aiter(chunks)
+    while True:
+        try:
+            chunk = await anext(iterator)
+        except StopAsyncIteration:
+            finished = True
+            chunk = b""
+        buffer = buffer[index:] + utf8.decode(chunk, final=finished)
+        index = 0
+
+        while True:
+            index = skip_whitespace(buffer, index)
+            if index == len(buffer):
+                break
+
+            if closed:
+                # The array was already closed, the rest of the document must only be whitespace
+                raise JSONDecodeError("Extra data", buffer, index)
+
+            if not started:
+                if buffer[index] != "[":
+                    raise ValueError(f"The JSON document should be an array, but starts with '{buffer[index]}'.")
+                started = True
+                index += 1
+                continue
+
+            if buffer[index] == "]":
+                if expect_value and values != 0:
+                    raise JSONDecodeError("Expecting value", buffer, index)
+                closed = True
+                index += 1
+                continue
+            if not expect_value:
+                if buffer[index] != ",":
+                    raise JSONDecodeError("Expecting ',' delimiter", buffer, index)
+                expect_value = True
+                index += 1
+                continue
+
+            try:
+                value, end = decoder.raw_decode(buffer, index)
+            except JSONDecodeError:
+                if finished:
+                    raise
+                # The value is not complete yet
+                break
+            if end == len(buffer) and not finished:
+                # A number could continue in the next chunk
+                break
+            yield value
+            values += 1
+            index = end
+            expect_value = False
+
+        if finished:
+            if closed:
+                return
+            raise JSONDecodeError("Unterminated array", buffer, index)
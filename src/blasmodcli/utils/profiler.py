@@ -0,0 +1,143 @@
+from contextlib import nullcontext
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, TextIO
+import asyncio
+import json
+import os
+import threading
+import time
+
+# The environment variable enabling the profiler, useful when the application is started by a script
+PROFILE_ENVIRONMENT_VARIABLE = "BLASMODCLI_PROFILE"
+
+
+class ProfileMode:
+    SUMMARY = "summary"
+    TRACE = "trace"
+
+    ALL = (SUMMARY, TRACE)
+
+
+def get_track() -> int:
+    """ Returns an identifier of the asyncio task or the thread that is running, so that concurrent spans are apart. """
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        task = None
+    return id(task) if task is not None else threading.get_ident()
+
+
+class Span:
+    """ A period of time spent doing something, which may contain smaller spans. """
+
+    def __init__(self, profiler: 'Profiler', name: str, category: str, args: dict[str, Any] | None = None):
+        self.profiler = profiler
+        self.name = name
+        self.category = category
+        self.args = args
+        self.parent: Span | None = None
+        self.track = 0
+        self.start = 0
+        self.end = 0
+
+    def __enter__(self) -> 'Span':
+        self.begin()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.finish()
+
+    @property
+    def duration(self) -> int:
+        return self.end - self.start
+
+    def begin(self):
+        self.parent = self.profiler.current_span.get()
+        self.token = self.profiler.current_span.set(self)
+        self.track = get_track()
+        self.start = time.perf_counter_ns()
+
+    def finish(self):
+        self.end = time.perf_counter_ns()
+        self.profiler.current_span.reset(self.token)
+        self.profiler.spans.append(self)
+
+
+class Profiler:
+    """
+    Records the time spent in the different phases of a run of the application.
+    When it is disabled, spans are a shared context manager that does nothing, so instrumented code runs as usual.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.spans: list[Span] = []
+        self.current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+        self.origin = time.perf_counter_ns()
+
+    def enable(self):
+        self.enabled = True
+        self.origin = time.perf_counter_ns()
+
+    def span(self, name: str, category: str, **args: Any) -> Span | nullcontext:
+        """
+        Measures the time spent in a block of code, as a span nested in the span that is currently open.
+        :param name: The name of the span, spans with the same name and parent are regrouped in the summary.
+        :param category: The kind of work done during the span.
+        :param args: Details about the span, only written to the trace.
+        """
+        if not self.enabled:
+            return NO_SPAN
+        return Span(self, name, category, args)
+
+    def children(self) -> dict[Span | None, list[Span]]:
+        children: dict[Span | None, list[Span]] = {}
+        for span in sorted(self.spans, key=lambda s: s.start):
+            children.setdefault(span.parent, []).append(span)
+        return children
+
+    def print_summary(self, output: TextIO):
+        """
+        Prints the tree of the spans, where the spans with the same name and parent are regrouped. The time of spans
+        that ran concurrently is summed, so it can be greater than the time of their parent.
+        """
+        children = self.children()
+        total = (time.perf_counter_ns() - self.origin) / 1_000_000
+        print(f"Profile of the run ({total:.1f} ms in total):", file=output)
+
+        def print_children(parents: list[Span | None], depth: int):
+            groups: dict[str, list[Span]] = {}
+            for parent in parents:
+                for span in children.get(parent, []):
+                    groups.setdefault(span.name, []).append(span)
+            for name, spans in groups.items():
+                duration = sum(span.duration for span in spans) / 1_000_000
+                count = f" ({len(spans)} times)" if len(spans) > 1 else ""
+                print(f"{"  " * depth}{duration:10.1f} ms  {name}{count}", file=output)
+                print_children(spans, depth + 1)
+
+        print_children([None], 1)
+
+    def write_trace(self, file: Path):
+        """ Writes the spans in the Chrome trace event format, which can be opened in chrome://tracing or Perfetto. """
+        tracks: dict[int, int] = {}
+        events = []
+        for span in sorted(self.spans, key=lambda s: s.start):
+            events.append({
+                "name": span.name,
+                "cat": span.category,
+                "ph": "X",
+                "ts": (span.start - self.origin) / 1000,
+                "dur": span.duration / 1000,
+                "pid": os.getpid(),
+                "tid": tracks.setdefault(span.track, len(tracks)),
+                "args": span.args or {}
+            })
+        with file.open("w") as fd:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, fd)
+
+
+NO_SPAN = nullcontext()
+
+profiler = Profiler()
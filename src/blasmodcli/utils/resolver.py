@@ -1,58 +1,140 @@
-from blasmodcli.exceptions.utils import UnresolvableDependency
+from typing import Iterator
+
+from blasmodcli.exceptions.utils import CircularDependency, UnresolvableDependency
 from blasmodcli.model import Mod, ModVersion, Version, Dependency
 
+# States of the mods while the dependency graph is traversed
+VISITING = 1
+VISITED = 2
+
 
 class ModVersionRange:
 
-    def __init__(self, dependency: Dependency):
-        self.mod = dependency.dependency
-        self.minimum_version = dependency.minimum_version
-        self.maximum_version = dependency.maximum_version
+    def __init__(self, mod: Mod, minimum_version: Version | None = None, maximum_version: Version | None = None):
+        self.mod = mod
+        self.minimum_version = minimum_version
+        self.maximum_version = maximum_version
+
+    @classmethod
+    def pinned(cls, mod_version: ModVersion) -> 'ModVersionRange':
+        """ Creates a range that only contains the version of a mod that was explicitly requested. """
+        return cls(mod_version.mod, mod_version.version, mod_version.version)
 
     @property
     def most_recent_version(self) -> Version:
         return self.maximum_version if self.maximum_version is not None else self.mod.latest_version
 
     def intersection(self, other: Dependency):
-        if self.minimum_version is None:
-            self.minimum_version = other.minimum_version
-        else:
-            self.minimum_version = max(self.minimum_version, other.minimum_version)
+        """
+        Restricts the range to the versions allowed by a dependency.
+        :raises UnresolvableDependency: If no version satisfies both the range and the dependency.
+
+        >>> version_range = ModVersionRange(Mod(latest_version=Version.from_tag("1.10.0")), Version.from_tag("1.9.0"))
+        >>> version_range.intersection(Dependency(minimum_version=Version.from_tag("1.10.0")))
+        >>> str(version_range.minimum_version)
+        '1.10.0'
+        """
+        if other.minimum_version is not None:
+            if self.minimum_version is None or other.minimum_version > self.minimum_version:
+                self.minimum_version = other.minimum_version
+
+        if other.maximum_version is not None:
+            if self.maximum_version is None or other.maximum_version < self.maximum_version:
+                self.maximum_version = other.maximum_version
+
+        if self.minimum_version is not None and self.minimum_version > self.most_recent_version:
+            raise UnresolvableDependency(self.mod, self.minimum_version, self.most_recent_version)
+
 
-        if self.maximum_version is None:
-            self.maximum_version = other.maximum_version
-        else:
-            self.maximum_version = min(self.maximum_version, other.maximum_version)
+class DependencyGraph:
+    """ The dependencies between the mods of a game, loaded all at once so that they can be traversed in memory. """
 
-        if self.minimum_version > self.maximum_version:
-            raise UnresolvableDependency(self.mod, self.minimum_version, self.maximum_version)
+    def __init__(self, dependencies: list[Dependency]):
+        self.dependencies: dict[int, list[Dependency]] = {}
+        self.required_by: dict[int, list[Dependency]] = {}
+        for dependency in dependencies:
+            self.dependencies.setdefault(dependency.mod_id, []).append(dependency)
+            self.required_by.setdefault(dependency.dependency_id, []).append(dependency)
+
+        # Sorting the dependencies of each mod makes the resolution deterministic
+        for mod_dependencies in self.dependencies.values():
+            mod_dependencies.sort(key=lambda dependency: (dependency.dependency.source_name, dependency.dependency.name))
+
+    def get_dependencies(self, mod: Mod) -> list[Dependency]:
+        """ Returns the dependencies of a mod to other mods. """
+        return self.dependencies.get(mod.id, [])
+
+    def get_required_by(self, mod: Mod) -> list[Dependency]:
+        """ Returns the dependencies of other mods to a mod. """
+        return self.required_by.get(mod.id, [])
 
 
 class DependencyResolver:
+    """
+    Resolves the dependencies of mods by traversing the dependency graph depth-first.
+    Every mod is expanded only once, however many mods depend on it, and the version ranges required by each
+    dependency are intersected along the way, so the resolution is linear in the size of the graph.
+    """
 
-    def __init__(self, mods: list[Mod]):
-        self.mods = mods
+    def __init__(self, mod_versions: list[ModVersion], graph: DependencyGraph):
+        self.mod_versions = mod_versions
+        self.graph = graph
         self.ranges: dict[int, ModVersionRange] = {}
-        self.path = []
+        self.states: dict[int, int] = {}
+        self.order: list[Mod] = []
 
     def get_latest_versions(self) -> list[ModVersion]:
-        return [
-            ModVersion(version_range.mod, version_range.most_recent_version)
-            for version_range in self.ranges.values()
-        ]
+        """
+        Returns the most recent version allowed for every mod, the requested ones included, in an order in which they
+        can be installed: every mod comes after the mods it depends on.
+        """
+        return [ModVersion(mod, self.ranges[mod.id].most_recent_version) for mod in self.order]
 
     def resolve(self):
-        queue: list[Dependency] = []
-        for mod in self.mods:
-            queue.extend(dep for dep in mod.dependencies)
-        index = 0
-        total = len(queue)
-        while index < total:
-            dependency = queue[index]
-            for dep in dependency.dependency.dependencies:
-                if dep in queue:
-                    continue
-                queue.append(dep)
-                total += 1
-            self.ranges[dependency.dependency_id] = ModVersionRange(dependency)
-            index += 1
+        """
+        :raises CircularDependency: If mods depend on each other.
+        :raises UnresolvableDependency: If no version of a mod satisfies every mod that depends on it.
+        """
+        for mod_version in self.mod_versions:
+            version_range = self.ranges.get(mod_version.mod.id)
+            if version_range is None:
+                self.ranges[mod_version.mod.id] = ModVersionRange.pinned(mod_version)
+            elif version_range.minimum_version != mod_version.version:
+                raise UnresolvableDependency(mod_version.mod, version_range.minimum_version, mod_version.version)
+
+        for mod_version in self.mod_versions:
+            self.visit(mod_version.mod)
+
+    def visit(self, root: Mod):
+        """ Adds a mod and all of its dependencies to the installation order, after the mods they depend on. """
+        if root.id in self.states:
+            return
+        path: list[Mod] = [root]
+        stack: list[Iterator[Dependency]] = [iter(self.graph.get_dependencies(root))]
+        self.states[root.id] = VISITING
+        while len(stack) != 0:
+            dependency = next(stack[-1], None)
+            if dependency is None:
+                # Every dependency of the mod on top of the path was added, so it can be added too
+                stack.pop()
+                mod = path.pop()
+                self.states[mod.id] = VISITED
+                self.order.append(mod)
+                continue
+
+            mod = dependency.dependency
+            self.constrain(dependency)
+            state = self.states.get(mod.id)
+            if state == VISITING:
+                raise CircularDependency(path[path.index(mod):] + [mod])
+            if state is None:
+                self.states[mod.id] = VISITING
+                path.append(mod)
+                stack.append(iter(self.graph.get_dependencies(mod)))
+
+    def constrain(self, dependency: Dependency):
+        """ Intersects the version range of a mod with the versions allowed by a dependency to it. """
+        version_range = self.ranges.get(dependency.dependency_id)
+        if version_range is None:
+            version_range = self.ranges[dependency.dependency_id] = ModVersionRange(dependency.dependency)
+        version_range.intersection(dependency)
@@ -1,6 +1,6 @@
 from .confirmation import accept_or_cancel, confirmation
 from .counter import Counter
-from .formatter import DateFormat, Formatter, format_bool, format_mod_name
+from .formatter import DateFormat, Formatter, format_bool, format_mod_name, format_size
 from .gui import ChoiceGUI
 from .mod_list import ModList
 from .numbered_list import NumberedList
@@ -4,17 +4,26 @@ from blasmodcli.utils.message import Message, ArrowStyle
 
 class Counter:
 
-    def __init__(self, total: int, message: str):
+    def __init__(self, total: int, message: str, complete: bool = True):
+        """
+        :param total: The number of things to count.
+        :param message: The message displayed before the counter.
+        :param complete: False if the total is not known yet, and increases as more things are found.
+        """
         self.done = 0
         self.total = total
         self.message = message
+        self.complete = complete
 
     def __str__(self) -> str:
         return f"{self.done}/{self.total}"
 
     @property
     def finished(self):
-        return self.done == self.total
+        return self.complete and self.done == self.total
+
+    def add(self):
+        self.total += 1
 
     def increment(self):
         self.done += 1
@@ -7,6 +7,8 @@ from blasmodcli.view.table import Table
 
 SEPARATOR = ", "
 
+SIZE_UNITS = ("B", "KiB", "MiB", "GiB", "TiB")
+
 
 class DateFormat:
     SIMPLE = "%Y-%m-%d"
@@ -19,6 +21,16 @@ def format_bool(boolean: bool) -> str:
     return Color.RED.fmt("No")
 
 
+def format_size(size: int) -> str:
+    """ Formats a number of bytes with the largest binary unit in which it is at least 1. """
+    value = float(size)
+    for unit in SIZE_UNITS[:-1]:
+        if abs(value) < 1024:
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} {SIZE_UNITS[-1]}"
+
+
 def format_mod_name(mod: Mod, display_name: bool = True) -> str:
     color = Color.BLUE if mod.is_library else Color.WHITE
     return color.fmt(mod.display_name if display_name else mod.name)
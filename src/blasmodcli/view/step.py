@@ -1,12 +1,22 @@
+from inspect import iscoroutinefunction
 from typing import Callable
 
 from blasmodcli.utils import Message
+from blasmodcli.utils.profiler import profiler
 
 
 def step(message: str) -> Callable[[Callable], Callable]:
     def decorator(function: Callable) -> Callable:
+        if iscoroutinefunction(function):
+            async def new_coroutine_function(*args, **kwargs):
+                Message.info(message)
+                with profiler.span(message, "step"):
+                    return await function(*args, **kwargs)
+            return new_coroutine_function
+
         def new_function(*args, **kwargs):
             Message.info(message)
-            return function(*args, **kwargs)
+            with profiler.span(message, "step"):
+                return function(*args, **kwargs)
         return new_function
     return decorator